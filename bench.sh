@@ -0,0 +1,3 @@
+python3 src/bench_htmlnode.py
+python3 src/bench_nodes_memory.py
+python3 src/bench.py "$@"
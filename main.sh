@@ -1 +1 @@
-python3 src/main.py
+python3 src/main.py build "$@"
@@ -0,0 +1,207 @@
+from array import array
+
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from markdown_helpers import iter_block_nodes
+
+KIND_HTML = 0
+KIND_LEAF = 1
+KIND_PARENT = 2
+KIND_CLASSES = {HTMLNode: KIND_HTML, LeafNode: KIND_LEAF, ParentNode: KIND_PARENT}
+NONE = -1
+
+# A whole HTML tree stored as parallel arrays indexed by node id. Structure is
+# kept as parent / first-child / next-sibling links; tag names, values and
+# attribute keys and values live in shared tables and are referenced by offset.
+class HTMLArena:
+    def __init__(self):
+        self.kinds = array("b")
+        self.tag_ids = array("H")
+        self.parents = array("i")
+        self.first_children = array("i")
+        self.next_siblings = array("i")
+        self.last_children = array("i")
+        self.values = array("i")
+        self.attr_starts = array("i")
+        self.attr_counts = array("H")
+        self.has_children_list = array("b")
+        self.attrs = array("i")
+        self.strings = []
+        self.tags = [None]
+        self.tag_index = {None: 0}
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def add_string(self, value):
+        if value is None:
+            return NONE
+        self.strings.append(value)
+        return len(self.strings) - 1
+
+    def add_node(self, kind, tag, value=None, props=None, parent=NONE, has_children_list=False):
+        index = len(self.kinds)
+        tag_id = self.tag_index.get(tag)
+        if tag_id is None:
+            tag_id = len(self.tags)
+            self.tags.append(tag)
+            self.tag_index[tag] = tag_id
+        self.kinds.append(kind)
+        self.tag_ids.append(tag_id)
+        self.parents.append(parent)
+        self.first_children.append(NONE)
+        self.next_siblings.append(NONE)
+        self.last_children.append(NONE)
+        self.values.append(self.add_string(value))
+        self.has_children_list.append(1 if has_children_list else 0)
+        if props is None:
+            self.attr_starts.append(NONE)
+            self.attr_counts.append(0)
+        else:
+            self.attr_starts.append(len(self.attrs))
+            self.attr_counts.append(len(props))
+            for key, prop_value in props.items():
+                self.attrs.append(self.add_string(key))
+                self.attrs.append(self.add_string(prop_value))
+        if parent != NONE:
+            previous = self.last_children[parent]
+            if previous == NONE:
+                self.first_children[parent] = index
+            else:
+                self.next_siblings[previous] = index
+            self.last_children[parent] = index
+        return index
+
+    def append_tree(self, node, parent=NONE):
+        root = NONE
+        stack = [(node, parent)]
+        while stack:
+            current, current_parent = stack.pop()
+            index = self.add_node(
+                KIND_CLASSES.get(type(current), KIND_HTML),
+                current.tag,
+                current.value,
+                current.props,
+                current_parent,
+                current.children is not None,
+            )
+            if root == NONE:
+                root = index
+            if current.children:
+                stack.extend((child, index) for child in reversed(current.children))
+        return root
+
+    @classmethod
+    def from_node(cls, node):
+        arena = cls()
+        arena.append_tree(node)
+        return arena
+
+    def children(self, index):
+        child = self.first_children[index]
+        while child != NONE:
+            yield child
+            child = self.next_siblings[child]
+
+    def props(self, index):
+        start = self.attr_starts[index]
+        if start == NONE:
+            return None
+        strings = self.strings
+        attrs = self.attrs
+        return {
+            strings[attrs[offset]]: strings[attrs[offset + 1]]
+            for offset in range(start, start + 2 * self.attr_counts[index], 2)
+        }
+
+    def value(self, index):
+        offset = self.values[index]
+        return None if offset == NONE else self.strings[offset]
+
+    def props_to_html(self, index):
+        start = self.attr_starts[index]
+        if start == NONE:
+            return ""
+        strings = self.strings
+        attrs = self.attrs
+        return "".join(
+            f' {strings[attrs[offset]]}="{strings[attrs[offset + 1]]}"'
+            for offset in range(start, start + 2 * self.attr_counts[index], 2)
+        )
+
+    # Returns the markup emitted on entering a node and whether the walk
+    # should descend into its children, mirroring each class's open_html.
+    def open_html(self, index):
+        kind = self.kinds[index]
+        tag = self.tags[self.tag_ids[index]]
+        has_children = self.first_children[index] != NONE
+        if kind == KIND_LEAF:
+            value = self.value(index)
+            if value is None:
+                raise ValueError
+            if tag is None:
+                return value, False
+            return f"<{tag}{self.props_to_html(index)}>{value}</{tag}>", False
+        if kind == KIND_PARENT:
+            if tag is None:
+                raise ValueError("Tag is required for ParentNode")
+            if not has_children:
+                return f"<{tag}{self.props_to_html(index)}></{tag}>", False
+            return f"<{tag}{self.props_to_html(index)}>", True
+        if tag is None:
+            return self.value(index), False
+        if not has_children:
+            return f"<{tag}{self.props_to_html(index)}>{self.value(index)}</{tag}>", False
+        return f"<{tag}{self.props_to_html(index)}>", True
+
+    def iter_html(self, root=0):
+        tags = self.tags
+        tag_ids = self.tag_ids
+        parents = self.parents
+        next_siblings = self.next_siblings
+        node = root
+        while True:
+            html, descend = self.open_html(node)
+            yield html
+            if descend:
+                node = self.first_children[node]
+                continue
+            while node != root and next_siblings[node] == NONE:
+                node = parents[node]
+                yield f"</{tags[tag_ids[node]]}>"
+            if node == root:
+                return
+            node = next_siblings[node]
+
+    def to_html(self, root=0):
+        return "".join(self.iter_html(root))
+
+    def write_html(self, fp, root=0):
+        for chunk in self.iter_html(root):
+            fp.write(chunk)
+
+    def to_node(self, root=0):
+        order = []
+        stack = [root]
+        while stack:
+            index = stack.pop()
+            order.append(index)
+            stack.extend(self.children(index))
+        nodes = {}
+        for index in reversed(order):
+            children = [nodes.pop(child) for child in self.children(index)] if self.has_children_list[index] else None
+            tag = self.tags[self.tag_ids[index]]
+            kind = self.kinds[index]
+            if kind == KIND_LEAF:
+                nodes[index] = LeafNode(tag, self.value(index), self.props(index))
+            elif kind == KIND_PARENT:
+                nodes[index] = ParentNode(tag, children, self.props(index))
+            else:
+                nodes[index] = HTMLNode(tag, self.value(index), children, self.props(index))
+        return nodes[root]
+
+def markdown_to_arena(markdown, cache=None, fused=False):
+    arena = HTMLArena()
+    root = arena.add_node(KIND_PARENT, "div", has_children_list=True)
+    for block_node in iter_block_nodes(markdown.split("\n"), cache, fused):
+        arena.append_tree(block_node, root)
+    return arena
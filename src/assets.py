@@ -0,0 +1,103 @@
+import os
+import shutil
+
+from build import load_manifest, remove_output, save_manifest, source_entry
+
+def find_assets(static_dir):
+    assets = []
+    for root, dirs, files in os.walk(static_dir):
+        dirs.sort()
+        for name in sorted(files):
+            assets.append(os.path.relpath(os.path.join(root, name), static_dir))
+    return assets
+
+# Copies inside the kernel where it can: copy_file_range may share extents on
+# copy-on-write filesystems, sendfile at least avoids the userspace buffer.
+def zero_copy(source_path, dest_path, size):
+    with open(source_path, "rb") as source, open(dest_path, "wb") as dest:
+        for copy in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+            if copy is None:
+                continue
+            try:
+                copied = 0
+                while copied < size:
+                    if copy is os.sendfile:
+                        sent = copy(dest.fileno(), source.fileno(), copied, size - copied)
+                    else:
+                        sent = copy(source.fileno(), dest.fileno(), size - copied, copied, copied)
+                    if sent == 0:
+                        break
+                    copied += sent
+                if copied == size:
+                    return
+            except OSError:
+                pass
+            dest.seek(0)
+            dest.truncate()
+        source.seek(0)
+        shutil.copyfileobj(source, dest)
+
+class AssetSync:
+    def __init__(self, static_dir, manifest_path=None, hardlink=False, zero_copy_threshold=1 << 20):
+        self.static_dir = static_dir
+        self.manifest_path = manifest_path
+        self.hardlink = hardlink
+        self.zero_copy_threshold = zero_copy_threshold
+
+    def outputs(self):
+        return set(find_assets(self.static_dir)) if os.path.isdir(self.static_dir) else set()
+
+    def copy(self, source_path, dest_path, size):
+        tmp_path = f"{dest_path}.{os.getpid()}.tmp"
+        if self.hardlink:
+            try:
+                os.link(source_path, tmp_path)
+                os.replace(tmp_path, dest_path)
+                return
+            except OSError:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        if size >= self.zero_copy_threshold:
+            zero_copy(source_path, tmp_path, size)
+        else:
+            shutil.copyfile(source_path, tmp_path)
+        shutil.copystat(source_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+
+    # Mirrors the static directory into output_dir and returns the status of
+    # every asset that was added, modified or deleted.
+    def sync(self, output_dir, assets=None):
+        previous_manifest = load_manifest(self.manifest_path)
+        manifest = {}
+        statuses = {}
+        if assets is None:
+            assets = self.outputs()
+        for asset in sorted(assets):
+            source_path = os.path.join(self.static_dir, asset)
+            dest_path = os.path.join(output_dir, asset)
+            previous = previous_manifest.get(asset)
+            entry = source_entry(source_path, previous)
+            try:
+                dest_stat = os.stat(dest_path)
+            except FileNotFoundError:
+                dest_stat = None
+            unchanged = (
+                previous is not None
+                and dest_stat is not None
+                and previous["source"] == entry["source"]
+                and previous.get("output_mtime_ns") == dest_stat.st_mtime_ns
+                and dest_stat.st_size == entry["size"]
+            )
+            if not unchanged:
+                os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+                self.copy(source_path, dest_path, entry["size"])
+                statuses[asset] = "added" if dest_stat is None else "modified"
+            entry["output_mtime_ns"] = os.stat(dest_path).st_mtime_ns
+            manifest[asset] = entry
+
+        for asset in previous_manifest:
+            if asset not in manifest and remove_output(output_dir, asset):
+                statuses[asset] = "deleted"
+        if self.manifest_path is not None:
+            save_manifest(self.manifest_path, manifest)
+        return statuses
@@ -0,0 +1,144 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from htmlnode import LeafNode, ParentNode
+from markdown_helpers import block_to_block_type, markdown_to_blocks, markdown_to_html_node
+from textnode import TextNode, TextType, split_nodes_image, split_nodes_link, text_to_textnodes
+
+WORDS = ["static", "site", "generator", "markdown", "block", "inline", "render", "node", "page", "build"]
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+def link_dense_prose(rng, paragraphs=200):
+    blocks = []
+    for p in range(paragraphs):
+        parts = []
+        for i in range(40):
+            choice = i % 5
+            if choice == 0:
+                parts.append(f"[{words(rng, 2)}](/docs/{p}/{i})")
+            elif choice == 1:
+                parts.append(f"![{words(rng, 2)}](/images/{p}-{i}.png)")
+            elif choice == 2:
+                parts.append(f"**{words(rng, 2)}**")
+            elif choice == 3:
+                parts.append(f"`{rng.choice(WORDS)}()`")
+            else:
+                parts.append(words(rng, 6))
+        blocks.append(" ".join(parts))
+    return "\n\n".join(blocks)
+
+def long_lists(rng, lists=20, items=500):
+    blocks = []
+    for n in range(lists):
+        if n % 2:
+            blocks.append("\n".join(f"{i}. {words(rng, 5)} [ref](/r/{i})" for i in range(1, items + 1)))
+        else:
+            blocks.append("\n".join(f"- {words(rng, 5)} *{rng.choice(WORDS)}*" for _ in range(items)))
+    return "\n\n".join(blocks)
+
+def huge_code_blocks(rng, blocks=10, lines=5000):
+    code = []
+    for _ in range(blocks):
+        body = "\n".join(f"    {rng.choice(WORDS)}({i}) **not bold** [not a link](x)" for i in range(lines))
+        code.append(f"```\n{body}\n```")
+    return "\n\n".join(code)
+
+def deep_nesting(rng, quotes=200, depth=50):
+    return "\n\n".join("> " * depth + words(rng, 8) for _ in range(quotes))
+
+def nested_tree(depth=5000):
+    node = LeafNode("code", "leaf")
+    for i in range(depth):
+        node = ParentNode("blockquote", [LeafNode(None, f"level {i} "), node])
+    return node
+
+CORPORA = {
+    "link_dense_prose": link_dense_prose,
+    "long_lists": long_lists,
+    "huge_code_blocks": huge_code_blocks,
+    "deep_nesting": deep_nesting,
+}
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def run_stages(markdown, repeat):
+    blocks = markdown_to_blocks(markdown)
+    inline_texts = [block for block in blocks if not block.startswith("```")]
+    node = markdown_to_html_node(markdown)
+    return {
+        "text_to_textnodes": best_time(lambda: [text_to_textnodes(text) for text in inline_texts], repeat),
+        "split_nodes_image_link": best_time(
+            lambda: [split_nodes_link(split_nodes_image([TextNode(text, TextType.TEXT)])) for text in inline_texts],
+            repeat,
+        ),
+        "block_to_block_type": best_time(lambda: [block_to_block_type(block) for block in blocks], repeat),
+        "markdown_to_html_node": best_time(lambda: markdown_to_html_node(markdown), repeat),
+        "markdown_to_html_fused": best_time(lambda: markdown_to_html_node(markdown, fused=True).to_html(), repeat),
+        "to_html": best_time(node.to_html, repeat),
+    }
+
+def run_benchmarks(repeat=5, seed=0):
+    results = {}
+    for name, generate in CORPORA.items():
+        markdown = generate(random.Random(seed))
+        for stage, seconds in run_stages(markdown, repeat).items():
+            results[f"{name}/{stage}"] = seconds
+    tree = nested_tree()
+    results["nested_tree/to_html"] = best_time(tree.to_html, repeat)
+    return results
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, previous in sorted(baseline.items()):
+        current = results.get(key)
+        if current is None or previous <= 0:
+            continue
+        ratio = current / previous
+        status = "REGRESSED" if ratio > 1 + threshold else "ok"
+        print(f"{key:<45} {previous * 1000:10.3f} ms -> {current * 1000:10.3f} ms  x{ratio:5.2f}  {status}")
+        if status != "ok":
+            regressions.append(key)
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="bench.py")
+    parser.add_argument("--output", help="write results as json to this path")
+    parser.add_argument("--compare", help="baseline json to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before a stage counts as regressed")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per stage, the fastest is kept")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.repeat)
+    report = {"python": platform.python_version(), "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+    else:
+        for key, seconds in results.items():
+            print(f"{key:<45} {seconds * 1000:10.3f} ms")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} stage(s) regressed past {args.threshold:.0%}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
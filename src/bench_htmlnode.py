@@ -0,0 +1,50 @@
+import sys
+import timeit
+
+from htmlnode import HTMLNode, LeafNode, ParentNode
+
+def recursive_to_html(node):
+    if isinstance(node, LeafNode):
+        return node.to_html()
+    if node.tag is None:
+        return node.value
+    if not node.children:
+        return f"<{node.tag}{node.props_to_html()}>{node.value}</{node.tag}>"
+    html = f"<{node.tag}{node.props_to_html()}>"
+    for child in node.children:
+        html += recursive_to_html(child)
+    return html + f"</{node.tag}>"
+
+def nested_tree(depth):
+    node = LeafNode("code", "x")
+    for i in range(depth):
+        node = ParentNode("blockquote", [LeafNode(None, f"level {i} "), node])
+    return node
+
+def wide_tree(paragraphs, spans):
+    blocks = []
+    for i in range(paragraphs):
+        children = [LeafNode("b" if j % 2 else None, f"span {j}") for j in range(spans)]
+        children.append(LeafNode("a", "link", {"href": f"/page/{i}"}))
+        blocks.append(HTMLNode("p", children=children))
+    return HTMLNode("div", children=blocks)
+
+def bench(name, node, number):
+    if recursive_to_html(node) != node.to_html():
+        raise ValueError(f"{name}: renderers disagree")
+    recursive = timeit.timeit(lambda: recursive_to_html(node), number=number) / number
+    iterative = timeit.timeit(node.to_html, number=number) / number
+    print(f"{name:<12} recursive {recursive * 1000:8.3f} ms  iterative {iterative * 1000:8.3f} ms")
+
+def main():
+    sys.setrecursionlimit(10000)
+    bench("wide", wide_tree(2000, 20), 10)
+    bench("nested-500", nested_tree(500), 50)
+    try:
+        recursive_to_html(nested_tree(20000))
+    except RecursionError:
+        print("nested-20000 recursive: RecursionError")
+    print(f"nested-20000 iterative: {len(nested_tree(20000).to_html())} chars")
+
+if __name__ == "__main__":
+    main()
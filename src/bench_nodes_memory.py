@@ -0,0 +1,54 @@
+import tracemalloc
+
+from arena import HTMLArena, KIND_LEAF
+from htmlnode import HTMLNode, LeafNode
+from textnode import TextNode, TextType
+
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+class DictHTMLNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+def bytes_per_node(factory, count):
+    texts = [f"span {i}" for i in range(count)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [factory(text) for text in texts]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del nodes
+    return (after - before) / count
+
+def arena_bytes_per_node(count):
+    texts = [f"span {i}" for i in range(count)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    arena = HTMLArena()
+    for text in texts:
+        arena.add_node(KIND_LEAF, "b", text)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del arena
+    return (after - before) / count
+
+def main():
+    count = 200000
+    rows = [
+        ("TextNode", lambda text: DictTextNode(text, TextType.BOLD), lambda text: TextNode(text, TextType.BOLD)),
+        ("LeafNode", lambda text: DictHTMLNode("b", text), lambda text: LeafNode("b", text)),
+        ("HTMLNode", lambda text: DictHTMLNode("p", children=[]), lambda text: HTMLNode("p", children=[])),
+    ]
+    for name, before, after in rows:
+        print(f"{name:<10} before {bytes_per_node(before, count):7.1f} B/node  after {bytes_per_node(after, count):7.1f} B/node")
+    print(f"{'Arena leaf':<10} {arena_bytes_per_node(count):7.1f} B/node")
+
+if __name__ == "__main__":
+    main()
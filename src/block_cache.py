@@ -0,0 +1,95 @@
+import hashlib
+import sqlite3
+import sys
+from collections import OrderedDict
+
+import htmlnode
+from parse_cache import PARSER_VERSION, modules_version
+
+# Rendered fragments go stale with the parser or the renderer, so the disk
+# keys are salted with a hash of their sources.
+CACHE_VERSION = modules_version((htmlnode, sys.modules[__name__]), PARSER_VERSION)
+
+class BlockCache:
+    def __init__(self, max_entries=4096, path=None, max_disk_entries=100000):
+        self.max_entries = max_entries
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.db = None
+
+    def get(self, block_type, block):
+        key = (block_type, block)
+        html = self.entries.get(key)
+        if html is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return html
+        if self.path is not None:
+            html = self.disk_get(block_type, block)
+            if html is not None:
+                self.remember(key, html)
+                self.hits += 1
+                return html
+        self.misses += 1
+        return None
+
+    def put(self, block_type, block, html):
+        self.remember((block_type, block), html)
+        if self.path is not None:
+            self.disk_put(block_type, block, html)
+
+    def remember(self, key, html):
+        self.entries[key] = html
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self.entries)}
+
+    def connect(self):
+        if self.db is None:
+            self.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute("CREATE TABLE IF NOT EXISTS blocks (key TEXT PRIMARY KEY, html TEXT NOT NULL, used INTEGER NOT NULL)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS blocks_used ON blocks (used)")
+        return self.db
+
+    def disk_key(self, block_type, block):
+        return hashlib.sha256(f"{CACHE_VERSION}\0{block_type.value}\0{block}".encode("utf-8")).hexdigest()
+
+    def disk_get(self, block_type, block):
+        db = self.connect()
+        key = self.disk_key(block_type, block)
+        row = db.execute("SELECT html FROM blocks WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        db.execute("UPDATE blocks SET used = (SELECT COALESCE(MAX(used), 0) + 1 FROM blocks) WHERE key = ?", (key,))
+        return row[0]
+
+    def disk_put(self, block_type, block, html):
+        db = self.connect()
+        db.execute(
+            "INSERT OR REPLACE INTO blocks (key, html, used) VALUES (?, ?, (SELECT COALESCE(MAX(used), 0) + 1 FROM blocks))",
+            (self.disk_key(block_type, block), html),
+        )
+
+    def prune(self):
+        if self.path is None:
+            return
+        db = self.connect()
+        (count,) = db.execute("SELECT COUNT(*) FROM blocks").fetchone()
+        if count > self.max_disk_entries:
+            db.execute(
+                "DELETE FROM blocks WHERE key IN (SELECT key FROM blocks ORDER BY used LIMIT ?)",
+                (count - self.max_disk_entries,),
+            )
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
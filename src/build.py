@@ -0,0 +1,441 @@
+import hashlib
+import json
+import os
+import time
+from multiprocessing import Pool
+
+import htmlnode
+import instrument
+import markdown_helpers
+from block_cache import BlockCache
+from markdown_helpers import BlockType, StreamedDocument, block_to_html_node, iter_blocks, markdown_to_html_node, markdown_to_html_node_parallel
+from front_matter import load_front_matter, read_front_matter, split_front_matter
+from image_size import ImageSizes
+from links import page_links
+from parse_cache import ParseCache, blocks_to_html_node, parse_markdown
+from search_index import PageTerms, store_page_terms
+from template import extract_title, page_slots
+
+block_cache = None
+parse_cache = None
+page_template = None
+stream_threshold = None
+collect_links = False
+search_dir = None
+block_cache_options = None
+image_sizes = None
+image_output_dir = None
+
+def find_pages(content_dir):
+    pages = []
+    for root, dirs, files in os.walk(content_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".md"):
+                pages.append(os.path.relpath(os.path.join(root, name), content_dir))
+    return pages
+
+def page_output_path(page):
+    return os.path.splitext(page)[0] + ".html"
+
+def read_source(source_path):
+    with open(source_path, encoding="utf-8") as f:
+        return f.read()
+
+def write_output(dest_path, html):
+    tmp_path = temp_output_path(dest_path)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return commit_output(tmp_path, dest_path)
+
+def temp_output_path(dest_path):
+    os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+    return f"{dest_path}.{os.getpid()}.tmp"
+
+# Identical outputs keep their old file and mtime so deploys only see real changes.
+# Changed outputs are renamed over the old name and never written into it, so a
+# hardlinked static asset is left untouched.
+def commit_output(tmp_path, dest_path):
+    if not os.path.exists(dest_path):
+        os.replace(tmp_path, dest_path)
+        return "added"
+    if os.path.getsize(tmp_path) == os.path.getsize(dest_path) and file_hash(tmp_path) == file_hash(dest_path):
+        os.remove(tmp_path)
+        return "unchanged"
+    os.replace(tmp_path, dest_path)
+    return "modified"
+
+# Returns (meta, node). On a parse cache hit the source is not read, so meta
+# is None and page_values reads the header when it needs the title.
+def page_node(source_path, source_digest, read=read_source):
+    if parse_cache is None:
+        meta, body = split_front_matter(read(source_path))
+        return meta, markdown_to_html_node(body, block_cache, fused=True)
+    blocks = parse_cache.load(source_digest)
+    if blocks is not None:
+        return None, blocks_to_html_node(blocks, fused=True)
+    meta, body = split_front_matter(read(source_path))
+    node, blocks = parse_markdown(body)
+    parse_cache.store(source_digest, blocks)
+    return meta, node
+
+# Returns (dest_path, status, stats, collected), where collected holds what
+# was observed while parsing the page, or None when nothing is collected.
+def build_page(job):
+    if not collect_links and search_dir is None and image_sizes is None:
+        return render_page(job) + (None,)
+    collected = {}
+    observers = []
+    if collect_links:
+        links = collected["links"] = []
+        observers.append(lambda text_nodes: links.extend(page_links(text_nodes)))
+    if search_dir is not None:
+        terms = PageTerms()
+        observers.append(terms.add)
+    if observers:
+        markdown_helpers.inline_observer = observe_all(observers)
+    if image_sizes is not None:
+        page = os.path.relpath(job[1], image_output_dir).replace(os.sep, "/")
+        htmlnode.image_props = lambda url: image_sizes.props(page, url)
+    try:
+        dest_path, status, stats = render_page(job)
+    finally:
+        markdown_helpers.inline_observer = None
+        htmlnode.image_props = None
+    if search_dir is not None:
+        store_page_terms(search_dir, job[2], terms.postings)
+    if image_sizes is not None:
+        collected["images"] = image_sizes.take_used()
+        collected["probed"] = image_sizes.take_probed()
+    return dest_path, status, stats, collected
+
+def observe_all(observers):
+    if len(observers) == 1:
+        return observers[0]
+    def observe(text_nodes):
+        for observer in observers:
+            observer(text_nodes)
+    return observe
+
+def render_page(job):
+    source_path, dest_path, source_digest = job
+    if stream_threshold is not None and os.path.getsize(source_path) > stream_threshold:
+        return build_page_streamed(source_path, dest_path)
+    if instrument.recorder is not None:
+        return build_page_instrumented(source_path, dest_path, source_digest)
+    meta, node = page_node(source_path, source_digest)
+    tmp_path = temp_output_path(dest_path)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        if page_template is None:
+            node.write_html(f)
+        else:
+            page_template.write(f, page_values(source_path, node, meta))
+    return dest_path, commit_output(tmp_path, dest_path), None
+
+def page_values(source_path, node, meta, title=None):
+    if meta is None:
+        meta = load_front_matter(source_path)
+    meta_title = meta.get("title")
+    if meta_title:
+        title = meta_title
+    elif title is None:
+        title = extract_title(node)
+    if title is None:
+        title = default_title(source_path)
+    return page_slots(meta, title, node)
+
+def default_title(source_path):
+    return os.path.splitext(os.path.basename(source_path))[0]
+
+# Headings are rendered again by the real pass, so page observers are
+# suspended while the title is looked up.
+def stream_title(lines):
+    observer, props = markdown_helpers.inline_observer, htmlnode.image_props
+    markdown_helpers.inline_observer = htmlnode.image_props = None
+    try:
+        for block_type, block_lines in iter_blocks(lines):
+            if block_type == BlockType.HEADING:
+                title = extract_title(block_to_html_node("\n".join(block_lines), block_type))
+                if title is not None:
+                    return title
+        return None
+    finally:
+        markdown_helpers.inline_observer, htmlnode.image_props = observer, props
+
+def build_page_streamed(source_path, dest_path):
+    start = time.perf_counter()
+    tmp_path = temp_output_path(dest_path)
+    with open(source_path, encoding="utf-8") as source, open(tmp_path, "w", encoding="utf-8") as f:
+        meta = read_front_matter(source)
+        body_start = source.tell()
+        document = StreamedDocument(source, block_cache)
+        if page_template is None:
+            document.write_html(f)
+        else:
+            title = stream_title(source) or default_title(source_path)
+            source.seek(body_start)
+            page_template.write(f, page_values(source_path, document, meta, title))
+    status = commit_output(tmp_path, dest_path)
+    if instrument.recorder is None:
+        return dest_path, status, None
+    return dest_path, status, whole_page_stats(source_path, dest_path, "stream", time.perf_counter() - start)
+
+def build_page_parallel(job, pool, worker_options):
+    source_path, dest_path, _ = job
+    start = time.perf_counter()
+    meta, markdown = split_front_matter(read_source(source_path))
+    node = markdown_to_html_node_parallel(markdown, pool)
+    template = worker_options.get("template")
+    tmp_path = temp_output_path(dest_path)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        if template is None:
+            node.write_html(f)
+        else:
+            title = stream_title(markdown.split("\n")) or default_title(source_path)
+            template.write(f, page_values(source_path, node, meta, title))
+    status = commit_output(tmp_path, dest_path)
+    if not worker_options.get("instrumented"):
+        return dest_path, status, None, None
+    return dest_path, status, whole_page_stats(source_path, dest_path, "parallel", time.perf_counter() - start), None
+
+def whole_page_stats(source_path, dest_path, stage, seconds):
+    return {
+        "page": source_path,
+        "seconds": seconds,
+        "stages": {stage: seconds},
+        "calls": {stage: 1},
+        "nodes": 0,
+        "output_bytes": os.path.getsize(dest_path),
+    }
+
+def render_html(source_path, node, meta):
+    if page_template is None:
+        return node.to_html()
+    return page_template.render(page_values(source_path, node, meta))
+
+def cache_counts():
+    counts = {}
+    if block_cache is not None:
+        counts["block_hits"], counts["block_misses"] = block_cache.hits, block_cache.misses
+    if parse_cache is not None:
+        counts["parse_hits"], counts["parse_misses"] = parse_cache.hits, parse_cache.misses
+    return counts
+
+def build_page_instrumented(source_path, dest_path, source_digest):
+    recorder = instrument.recorder
+    before = cache_counts()
+    start = time.perf_counter()
+    read = lambda path: recorder.call("read", read_source, path)
+    meta, node = recorder.call("markdown_to_html_node", page_node, source_path, source_digest, read)
+    html = recorder.call("to_html", render_html, source_path, node, meta)
+    status = recorder.call("write", write_output, dest_path, html)
+    seconds = time.perf_counter() - start
+    stages, calls = recorder.take()
+    after = cache_counts()
+    return dest_path, status, {
+        "page": source_path,
+        "seconds": seconds,
+        "stages": stages,
+        "calls": calls,
+        "nodes": instrument.count_nodes(node),
+        "output_bytes": len(html.encode("utf-8")),
+        "cache": {key: after[key] - before[key] for key in after},
+    }
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(manifest_path):
+    if manifest_path is None or not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+def save_manifest(manifest_path, manifest):
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+def source_entry(source_path, previous):
+    stat = os.stat(source_path)
+    if previous and previous["mtime_ns"] == stat.st_mtime_ns and previous["size"] == stat.st_size:
+        source_digest = previous["source"]
+    else:
+        source_digest = file_hash(source_path)
+    return {"source": source_digest, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+def remove_output(output_dir, output):
+    path = os.path.join(output_dir, output)
+    if not os.path.exists(path):
+        return False
+    os.remove(path)
+    directory = os.path.dirname(path)
+    while os.path.abspath(directory) != os.path.abspath(output_dir):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+    return True
+
+def init_worker(worker_options):
+    global block_cache, parse_cache, page_template, stream_threshold, collect_links, search_dir, block_cache_options, image_sizes, image_output_dir
+    cache_options = worker_options.get("cache_options")
+    parse_cache_dir = worker_options.get("parse_cache_dir")
+    page_template = worker_options.get("template")
+    stream_threshold = worker_options.get("stream_threshold")
+    collect_links = worker_options.get("collect_links", False)
+    search_dir = worker_options.get("search_dir")
+    image_options = worker_options.get("image_options")
+    image_sizes = ImageSizes(image_options["roots"], image_options["path"]) if image_options is not None else None
+    image_output_dir = image_options["output_dir"] if image_options is not None else None
+    # A long-lived process such as the build daemon keeps its warm cache
+    if cache_options is None:
+        block_cache = None
+    elif block_cache is None or cache_options != block_cache_options:
+        block_cache = BlockCache(**cache_options)
+    block_cache_options = cache_options
+    parse_cache = ParseCache(parse_cache_dir) if parse_cache_dir is not None else None
+    if worker_options.get("instrumented"):
+        instrument.enable()
+
+def build_site(content_dir, output_dir, jobs=1, manifest_path=None, cache_options=None, report=None, template=None, parse_cache_dir=None, stream_threshold=None, parallel_threshold=None, changes_path=None, link_graph=None, search_index=None, metadata_index=None, image_sizes=None, assets=None):
+    previous_manifest = load_manifest(manifest_path)
+    manifest = {}
+    build_jobs = []
+    for page in find_pages(content_dir):
+        source_path = os.path.join(content_dir, page)
+        previous = previous_manifest.get(page)
+        entry = source_entry(source_path, previous)
+        entry["template"] = template.digest if template is not None else None
+        entry["output"] = page_output_path(page)
+        manifest[page] = entry
+        if metadata_index is not None:
+            metadata_index.update(page, source_path, entry)
+        dest_path = os.path.join(output_dir, entry["output"])
+        unchanged = previous is not None and all(previous.get(key) == entry[key] for key in ("source", "template", "output"))
+        observed = (link_graph is None or entry["output"] in link_graph) and (search_index is None or search_index.has(entry["source"]))
+        images = previous.get("images") if previous is not None else None
+        if image_sizes is not None and (images is None or image_sizes.changed(images)):
+            observed = False
+        if not unchanged or not observed or not os.path.exists(dest_path):
+            build_jobs.append((source_path, dest_path, entry["source"]))
+        elif images is not None:
+            entry["images"] = images
+
+    page_outputs = {entry["output"].replace(os.sep, "/") for entry in manifest.values()}
+    if metadata_index is not None:
+        check_collisions(page_outputs, metadata_index.outputs(), "listing")
+    asset_outputs = assets.outputs() if assets is not None else set()
+    check_collisions(page_outputs, {asset.replace(os.sep, "/") for asset in asset_outputs}, "static asset")
+
+    written = []
+    changes = {"added": [], "modified": [], "deleted": []}
+    for page, previous in previous_manifest.items():
+        if page in manifest:
+            continue
+        if previous["output"] not in asset_outputs and remove_output(output_dir, previous["output"]):
+            changes["deleted"].append(previous["output"])
+        if link_graph is not None:
+            link_graph.remove(previous["output"])
+    # Assets go before rendering so image sizes can be read from the output tree
+    if assets is not None:
+        record_statuses(output_dir, assets.sync(output_dir, asset_outputs), written, changes)
+
+    worker_options = {
+        "cache_options": cache_options,
+        "instrumented": report is not None,
+        "template": template,
+        "parse_cache_dir": parse_cache_dir,
+        "stream_threshold": stream_threshold,
+        "parallel_threshold": parallel_threshold,
+        "collect_links": link_graph is not None,
+        "search_dir": search_index.directory if search_index is not None else None,
+        "image_options": {"roots": image_sizes.roots, "path": image_sizes.path, "output_dir": output_dir} if image_sizes is not None else None,
+    }
+    pages_by_dest = {job[1]: os.path.relpath(job[0], content_dir) for job in build_jobs}
+    for dest_path, status, stats, collected in render_pages(build_jobs, jobs, worker_options):
+        output = os.path.relpath(dest_path, output_dir)
+        if image_sizes is not None:
+            manifest[pages_by_dest[dest_path]]["images"] = collected["images"]
+            image_sizes.merge(collected["probed"])
+        if status != "unchanged":
+            written.append(dest_path)
+            changes[status].append(output)
+        if link_graph is not None:
+            link_graph.add(output, collected["links"])
+        if report is not None:
+            report.add(stats)
+    if cache_options is not None and cache_options.get("path") is not None:
+        shared_cache = BlockCache(**cache_options)
+        shared_cache.prune()
+        shared_cache.close()
+    if metadata_index is not None:
+        record_statuses(output_dir, metadata_index.write(output_dir, template), written, changes)
+    if image_sizes is not None and image_sizes.path is not None:
+        image_sizes.save()
+    if search_index is not None:
+        record_statuses(output_dir, search_index.write([(entry["output"], entry["source"]) for entry in manifest.values()], output_dir), written, changes)
+    if manifest_path is not None:
+        save_manifest(manifest_path, manifest)
+    if changes_path is not None:
+        save_manifest(changes_path, {key: sorted(paths) for key, paths in changes.items()})
+    return written
+
+def check_collisions(page_outputs, outputs, kind):
+    collisions = sorted(page_outputs.intersection(outputs))
+    if collisions:
+        raise RuntimeError(f"{kind} output would overwrite a rendered page: {', '.join(collisions)}")
+
+def record_statuses(output_dir, statuses, written, changes):
+    for output, status in statuses.items():
+        if status in ("added", "modified"):
+            written.append(os.path.join(output_dir, output))
+        if status != "unchanged":
+            changes[status].append(output)
+
+# Adds statuses of outputs written after build_site, such as .gz companions,
+# to the changes manifest it left behind.
+def merge_changes(changes_path, statuses):
+    changes = load_manifest(changes_path)
+    for output, status in statuses.items():
+        if status != "unchanged":
+            changes.setdefault(status, []).append(output)
+    save_manifest(changes_path, {key: sorted(paths) for key, paths in changes.items()})
+
+# Observed pages need every inline span handled by the worker that owns the page
+def observes_pages(worker_options):
+    return worker_options.get("collect_links") or worker_options.get("search_dir") is not None or worker_options.get("image_options") is not None
+
+def is_parallel_page(source_path, worker_options):
+    parallel_threshold = worker_options.get("parallel_threshold")
+    if parallel_threshold is None or observes_pages(worker_options):
+        return False
+    size = os.path.getsize(source_path)
+    stream_threshold = worker_options.get("stream_threshold")
+    return size >= parallel_threshold and (stream_threshold is None or size <= stream_threshold)
+
+def render_pages(build_jobs, jobs, worker_options):
+    if jobs > 1:
+        large_jobs = [job for job in build_jobs if is_parallel_page(job[0], worker_options)]
+        page_jobs = [job for job in build_jobs if not is_parallel_page(job[0], worker_options)] if large_jobs else build_jobs
+        if len(page_jobs) > 1 or large_jobs:
+            chunksize = max(1, len(page_jobs) // (jobs * 4))
+            with Pool(jobs, init_worker, (worker_options,)) as pool:
+                results = list(pool.imap(build_page, page_jobs, chunksize))
+                results.extend(build_page_parallel(job, pool, worker_options) for job in large_jobs)
+                return results
+    init_worker(worker_options)
+    try:
+        return [build_page(job) for job in build_jobs]
+    finally:
+        if block_cache is not None:
+            block_cache.close()
+        if worker_options.get("instrumented"):
+            instrument.disable()
@@ -0,0 +1,50 @@
+import argparse
+import json
+import os
+import socket
+import sys
+
+# Deliberately imports nothing from the site generator so that talking to a
+# running daemon costs only interpreter startup.
+def request(socket_path, payload):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with client.makefile("rb") as f:
+            return json.loads(f.readline())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="client.py")
+    parser.add_argument("--socket", default=".cache/daemon.sock", help="unix socket the daemon listens on")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("ping", help="check that the daemon is running")
+    subparsers.add_parser("build", help="run an incremental build of the daemon's site")
+    render_parser = subparsers.add_parser("render", help="render one markdown file to stdout")
+    render_parser.add_argument("path", help="markdown file to render, - reads stdin")
+    render_parser.add_argument("--bare", action="store_true", help="skip the page template")
+    subparsers.add_parser("stop", help="shut the daemon down")
+    args = parser.parse_args(argv)
+
+    payload = {"command": args.command}
+    if args.command == "render":
+        if args.path == "-":
+            payload["markdown"] = sys.stdin.read()
+        else:
+            # The daemon runs in its own working directory.
+            payload["path"] = os.path.abspath(args.path)
+        payload["template"] = not args.bare
+    try:
+        response = request(args.socket, payload)
+    except OSError as error:
+        parser.exit(2, f"cannot reach daemon on {args.socket}: {error}\n")
+    if not response.get("ok"):
+        parser.exit(1, f"{response.get('error')}\n")
+    if args.command == "render":
+        sys.stdout.write(response["html"])
+    elif args.command == "build":
+        print(f"Built {len(response['written'])} changed outputs in {response['seconds'] * 1000:.1f} ms")
+    elif args.command == "ping":
+        print(f"Daemon running as pid {response['pid']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import os
+import zlib
+from multiprocessing import Pool
+
+from build import commit_output, load_manifest, save_manifest, source_entry
+
+COMPRESSIBLE_EXTENSIONS = {".html", ".css", ".js", ".json", ".xml", ".svg", ".txt", ".map"}
+
+def find_compressible(output_dir):
+    paths = []
+    for root, dirs, files in os.walk(output_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1] in COMPRESSIBLE_EXTENSIONS:
+                paths.append(os.path.relpath(os.path.join(root, name), output_dir))
+    return paths
+
+def gzip_bytes(data, level=9):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+def compress_file(job):
+    path, level = job
+    with open(path, "rb") as f:
+        data = f.read()
+    compressed = gzip_bytes(data, level)
+    gz_path = path + ".gz"
+    if len(compressed) >= len(data):
+        if os.path.exists(gz_path):
+            os.remove(gz_path)
+            return path, len(data), None, "deleted"
+        return path, len(data), None, "unchanged"
+    tmp_path = f"{gz_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(compressed)
+    return path, len(data), len(compressed), commit_output(tmp_path, gz_path)
+
+def compress_outputs(output_dir, jobs=1, manifest_path=None, level=9):
+    previous_manifest = load_manifest(manifest_path)
+    manifest = {}
+    compress_jobs = []
+    for output in find_compressible(output_dir):
+        path = os.path.join(output_dir, output)
+        previous = previous_manifest.get(output)
+        entry = source_entry(path, previous)
+        manifest[output] = entry
+        gz_exists = os.path.exists(path + ".gz")
+        if previous is not None and previous["source"] == entry["source"] and previous.get("level") == level:
+            if gz_exists == (previous["compressed_size"] is not None):
+                entry["level"] = level
+                entry["compressed_size"] = previous["compressed_size"]
+                continue
+        compress_jobs.append((path, level))
+
+    statuses = {}
+    for output in previous_manifest:
+        if output not in manifest:
+            gz_path = os.path.join(output_dir, output + ".gz")
+            if os.path.exists(gz_path):
+                os.remove(gz_path)
+                statuses[output + ".gz"] = "deleted"
+
+    if jobs > 1 and len(compress_jobs) > 1:
+        with Pool(jobs) as pool:
+            results = list(pool.imap(compress_file, compress_jobs, max(1, len(compress_jobs) // (jobs * 4))))
+    else:
+        results = [compress_file(job) for job in compress_jobs]
+    for path, _, compressed_size, status in results:
+        output = os.path.relpath(path, output_dir)
+        manifest[output]["level"] = level
+        manifest[output]["compressed_size"] = compressed_size
+        statuses[output + ".gz"] = status
+
+    if manifest_path is not None:
+        save_manifest(manifest_path, manifest)
+
+    original_bytes = sum(entry["size"] for entry in manifest.values() if entry["compressed_size"] is not None)
+    compressed_bytes = sum(entry["compressed_size"] for entry in manifest.values() if entry["compressed_size"] is not None)
+    return {
+        "files": len(manifest),
+        "compressed": len(results),
+        "skipped": len(manifest) - len(results),
+        "original_bytes": original_bytes,
+        "compressed_bytes": compressed_bytes,
+        "saved_bytes": original_bytes - compressed_bytes,
+        "statuses": statuses,
+    }
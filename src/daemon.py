@@ -0,0 +1,110 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+
+import build
+from build import build_site, default_title, init_worker, read_source
+from front_matter import split_front_matter
+from markdown_helpers import markdown_to_html_node
+from template import extract_title, load_template, page_slots
+
+# Keeps the parser, template and block cache of one site warm in a single
+# process and answers newline delimited json requests on a unix socket.
+class BuildDaemon:
+    def __init__(self, content_dir, output_dir, build_options, template_path=None):
+        self.content_dir = content_dir
+        self.output_dir = output_dir
+        self.build_options = build_options
+        self.template_path = template_path
+        init_worker({"cache_options": build_options.get("cache_options")})
+
+    def template(self):
+        if self.template_path is None or not os.path.exists(self.template_path):
+            return None
+        return load_template(self.template_path)
+
+    def handle(self, request):
+        command = request.get("command")
+        if command == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if command == "build":
+            return self.build()
+        if command == "render":
+            return self.render(request)
+        return {"ok": False, "error": f"unknown command: {command}"}
+
+    def build(self):
+        start = time.perf_counter()
+        written = build_site(self.content_dir, self.output_dir, 1, template=self.template(), **self.build_options)
+        return {"ok": True, "written": written, "seconds": time.perf_counter() - start}
+
+    # Renders one page without touching the output tree. The markdown may be
+    # sent inline, for example an unsaved editor buffer, or read from path.
+    def render(self, request):
+        path = request.get("path")
+        markdown = request.get("markdown")
+        if markdown is None:
+            if path is None:
+                return {"ok": False, "error": "render needs a path or markdown"}
+            if not os.path.isabs(path):
+                return {"ok": False, "error": f"render needs an absolute path, got {path}"}
+            markdown = read_source(path)
+        meta, body = split_front_matter(markdown)
+        node = markdown_to_html_node(body, build.block_cache, fused=True)
+        template = self.template()
+        if template is None or not request.get("template", True):
+            return {"ok": True, "html": node.to_html()}
+        title = meta.get("title") or extract_title(node) or default_title(path or "untitled")
+        return {"ok": True, "html": template.render(page_slots(meta, title, node))}
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if request.get("command") == "stop":
+                    response = {"ok": True}
+                    threading.Thread(target=self.server.shutdown).start()
+                else:
+                    response = self.server.build_daemon.handle(request)
+            except Exception as error:
+                response = {"ok": False, "error": f"{type(error).__name__}: {error}"}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+def socket_in_use(socket_path):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except OSError:
+        return False
+    finally:
+        client.close()
+    return True
+
+def make_daemon_server(socket_path, daemon):
+    if os.path.exists(socket_path):
+        if socket_in_use(socket_path):
+            raise RuntimeError(f"a daemon is already listening on {socket_path}")
+        os.remove(socket_path)
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+    server = socketserver.UnixStreamServer(socket_path, DaemonRequestHandler)
+    server.build_daemon = daemon
+    return server
+
+def run_daemon(socket_path, daemon):
+    server = make_daemon_server(socket_path, daemon)
+    print(f"Build daemon listening on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
@@ -0,0 +1,54 @@
+FENCE = "---"
+MAX_HEADER_LINES = 256
+
+def parse_value(value):
+    value = value.strip()
+    if value.startswith("[") and value.endswith("]"):
+        return [item.strip().strip("\"'") for item in value[1:-1].split(",") if item.strip()]
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+def parse_front_matter(lines):
+    meta = {}
+    for line in lines:
+        if not line.strip() or line.lstrip().startswith("#") or ":" not in line:
+            continue
+        key, value = line.split(":", 1)
+        meta[key.strip().lower()] = parse_value(value)
+    return meta
+
+# Reads the leading "---" delimited block from an open file and leaves it
+# positioned at the start of the body. Files without one are left untouched.
+def read_front_matter(f):
+    start = f.tell()
+    if f.readline().rstrip("\r\n") != FENCE:
+        f.seek(start)
+        return {}
+    lines = []
+    for _ in range(MAX_HEADER_LINES):
+        line = f.readline()
+        if not line:
+            break
+        line = line.rstrip("\r\n")
+        if line == FENCE:
+            return parse_front_matter(lines)
+        lines.append(line)
+    f.seek(start)
+    return {}
+
+def load_front_matter(path):
+    with open(path, encoding="utf-8") as f:
+        return read_front_matter(f)
+
+def split_front_matter(markdown):
+    if not markdown.startswith(FENCE):
+        return {}, markdown
+    lines = markdown.split("\n", MAX_HEADER_LINES + 1)
+    if lines[0].rstrip("\r") != FENCE:
+        return {}, markdown
+    for i in range(1, min(len(lines), MAX_HEADER_LINES + 1)):
+        if lines[i].rstrip("\r") == FENCE:
+            body = "\n".join(lines[i + 1:])
+            return parse_front_matter(line.rstrip("\r") for line in lines[1:i]), body
+    return {}, markdown
@@ -1,5 +1,17 @@
+import sys
+
 from textnode import TextType, TextNode
 
+# When set, called with an image url and returns extra img props, such as
+# width and height, or None.
+image_props = None
+
+def img_props(text_node):
+    props = {"src": text_node.url, "alt": text_node.text}
+    if image_props is not None:
+        props.update(image_props(text_node.url) or {})
+    return props
+
 def text_node_to_html_node(text_node):
     if not isinstance(text_node, TextNode):
         raise ValueError("Input must be a TextNode")
@@ -19,13 +31,50 @@ def text_node_to_html_node(text_node):
         case TextType.IMAGE:
             if not text_node.url or not text_node.text:
                 raise ValueError("Image TextNode must have a URL and text (for alt)")
-            return LeafNode(tag="img", value= "", props={"src": text_node.url, "alt": text_node.text})
+            return LeafNode(tag="img", value= "", props=img_props(text_node))
         case _:
             raise ValueError(f"Invalid TextType:{text_node.text_type}")
 
+TEXT_TYPE_TAGS = {
+    TextType.TEXT: ("", ""),
+    TextType.BOLD: ("<b>", "</b>"),
+    TextType.ITALIC: ("<i>", "</i>"),
+    TextType.CODE: ("<code>", "</code>"),
+}
+
+# Renders a TextNode stream straight to the markup text_node_to_html_node
+# followed by to_html() would produce, without allocating LeafNodes.
+def text_nodes_to_html(text_nodes):
+    parts = []
+    for text_node in text_nodes:
+        text = text_node.text
+        if text is None:
+            raise ValueError
+        tags = TEXT_TYPE_TAGS.get(text_node.text_type)
+        if tags is not None:
+            parts.append(tags[0])
+            parts.append(text)
+            parts.append(tags[1])
+        elif text_node.text_type == TextType.LINK:
+            if not text_node.url:
+                raise ValueError("Link TextNode must have a URL")
+            parts.append(f'<a href="{text_node.url}">{text}</a>')
+        elif text_node.text_type == TextType.IMAGE:
+            if not text_node.url or not text:
+                raise ValueError("Image TextNode must have a URL and text (for alt)")
+            if image_props is None:
+                parts.append(f'<img src="{text_node.url}" alt="{text}"></img>')
+            else:
+                parts.append(f"<img{LeafNode(props=img_props(text_node)).props_to_html()}></img>")
+        else:
+            raise ValueError(f"Invalid TextType:{text_node.text_type}")
+    return "".join(parts)
+
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
-        self.tag = tag
+        self.tag = sys.intern(tag) if type(tag) is str else tag
         self.value = value
         self.children = children
         self.props = props
@@ -33,15 +82,33 @@ class HTMLNode:
     def to_html(self):
         if self.tag is None:
             return self.value
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        stack = [(iter((self,)), None)]
+        while stack:
+            nodes, closing_tag = stack[-1]
+            for node in nodes:
+                html, children = node.open_html()
+                yield html
+                if children is not None:
+                    stack.append((iter(children), f"</{node.tag}>"))
+                    break
+            else:
+                stack.pop()
+                if closing_tag is not None:
+                    yield closing_tag
+
+    def open_html(self):
+        if self.tag is None:
+            return self.value, None
         if not self.children:
-            return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
-        props_str = self.props_to_html()
-        opening_tag = f"<{self.tag}{props_str}>"
-        children_html = ""
-        for child in self.children:
-            children_html += child.to_html()
-        closing_tag = f"</{self.tag}>"
-        return f"{opening_tag}{children_html}{closing_tag}"
+            return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>", None
+        return f"<{self.tag}{self.props_to_html()}>", self.children
+
+    def write_html(self, fp):
+        for chunk in self.iter_html():
+            fp.write(chunk)
 
     def props_to_html(self):
         if self.props == None:
@@ -52,22 +119,26 @@ class HTMLNode:
         return (f"HTMLNode: {self.tag}, {self.value}, {self.children}, {self.props}")
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag=None, value=None,  props=None):
         super().__init__( tag=tag,value=value, props=props, children=None)
 
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def open_html(self):
         if self.tag is None:
             if self.value is None:
                 raise ValueError
-            return self.value
+            return self.value, None
         if self.value is None:
             raise ValueError
-        props_str = ""
-        if self.props:
-            props_str = " " + " ".join(f'{key}="{value}"' for key, value in self.props.items())
-        return f"<{self.tag}{props_str}>{self.value}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>", None
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         if tag is None:
             raise ValueError("Tag is required for ParentNode")
@@ -76,18 +147,11 @@ class ParentNode(HTMLNode):
         super().__init__(tag=tag, value=None,  children=children, props=props)
 
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def open_html(self):
         if self.tag is None:
             raise ValueError("Tag is required for ParentNode")
         if self.children is None:
             raise ValueError("Children are required for the ParentNode")
-        if self.props is not None and len(self.props) > 0:
-            attributes = ' '.join(f'{key}="{value}"' for key, value in self.props.items())
-            opening_tag = f"<{self.tag} {attributes}>"
-        else:
-            opening_tag = f"<{self.tag}>"
-
-        html = opening_tag
-        for child in self.children:
-            html += child.to_html()
-        html += f"</{self.tag}>"
-        return html
+        return f"<{self.tag}{self.props_to_html()}>", self.children
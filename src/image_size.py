@@ -0,0 +1,147 @@
+import json
+import os
+import struct
+
+from links import resolve_url
+
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+def probe_png(head):
+    if head[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", head[16:24])
+
+def probe_gif(head):
+    return struct.unpack("<HH", head[6:10])
+
+def probe_webp(head):
+    chunk = head[12:16]
+    if chunk == b"VP8X":
+        return 1 + int.from_bytes(head[24:27], "little"), 1 + int.from_bytes(head[27:30], "little")
+    if chunk == b"VP8 " and head[23:26] == b"\x9d\x01\x2a":
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and head[20] == 0x2F:
+        bits = int.from_bytes(head[21:25], "little")
+        return 1 + (bits & 0x3FFF), 1 + ((bits >> 14) & 0x3FFF)
+    return None
+
+# Walks the JPEG segment headers, seeking over their payloads, until the
+# start of frame segment that carries the dimensions.
+def probe_jpeg(f):
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            continue
+        if marker == 0xD9 or marker == 0xDA:
+            return None
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        length = struct.unpack(">H", length)[0]
+        if marker in JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        f.seek(length - 2, 1)
+
+def probe_image(path):
+    with open(path, "rb") as f:
+        head = f.read(30)
+        try:
+            if head.startswith(b"\x89PNG\r\n\x1a\n") and len(head) >= 24:
+                return probe_png(head)
+            if head[:6] in (b"GIF87a", b"GIF89a") and len(head) >= 10:
+                return probe_gif(head)
+            if head[:4] == b"RIFF" and head[8:12] == b"WEBP" and len(head) >= 30:
+                return probe_webp(head)
+            if head[:2] == b"\xff\xd8":
+                return probe_jpeg(f)
+        except struct.error:
+            return None
+    return None
+
+# Width and height of local images, looked up under the directories that the
+# site root maps onto and cached by path, mtime and size.
+class ImageSizes:
+    def __init__(self, roots, path=None):
+        self.roots = roots
+        self.path = path
+        self.entries = {}
+        self.probed = {}
+        self.used = {}
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def size(self, image_path):
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None
+        entry = self.entries.get(image_path)
+        if entry is None or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+            try:
+                dimensions = probe_image(image_path)
+            except OSError:
+                return None
+            entry = [stat.st_mtime_ns, stat.st_size] + (list(dimensions) if dimensions else [None, None])
+            self.entries[image_path] = entry
+            self.probed[image_path] = entry
+        self.used[image_path] = entry[:2]
+        if entry[2] is None:
+            return None
+        return entry[2], entry[3]
+
+    def find(self, page, url):
+        target = resolve_url(page, url)
+        if target is None or target == "..":
+            return None
+        for root in self.roots:
+            image_path = os.path.join(root, *target.split("/"))
+            if os.path.isfile(image_path):
+                return self.size(image_path)
+        return None
+
+    def props(self, page, url):
+        dimensions = self.find(page, url)
+        if dimensions is None:
+            return None
+        return {"width": str(dimensions[0]), "height": str(dimensions[1])}
+
+    def take_probed(self):
+        probed, self.probed = self.probed, {}
+        return probed
+
+    def take_used(self):
+        used, self.used = self.used, {}
+        return used
+
+    def changed(self, used):
+        for image_path, (mtime_ns, size) in used.items():
+            try:
+                stat = os.stat(image_path)
+            except OSError:
+                return True
+            if stat.st_mtime_ns != mtime_ns or stat.st_size != size:
+                return True
+        return False
+
+    def merge(self, probed):
+        self.entries.update(probed)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        entries = {image_path: entry for image_path, entry in self.entries.items() if os.path.exists(image_path)}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,141 @@
+import heapq
+import json
+import time
+from functools import wraps
+
+import markdown_helpers
+
+TIMED_FUNCTIONS = {
+    "markdown_to_blocks": ("markdown_to_blocks", False),
+    "iter_blocks": ("markdown_to_blocks", True),
+    "block_to_block_type": ("block_to_block_type", False),
+    "lines_to_block_type": ("block_to_block_type", False),
+    "text_to_children": ("text_to_children", False),
+    "text_to_fused_children": ("text_to_children", False),
+}
+
+recorder = None
+originals = {}
+
+# Stage times are exclusive: time spent in a nested timed call is charged to
+# that call's stage and subtracted from the caller's.
+class Recorder:
+    def __init__(self):
+        self.stack = []
+        self.stages = {}
+        self.calls = {}
+
+    def call(self, stage, func, *args, **kwargs):
+        self.stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self.stack.pop()
+            self.stages[stage] = self.stages.get(stage, 0.0) + elapsed - nested
+            self.calls[stage] = self.calls.get(stage, 0) + 1
+            if self.stack:
+                self.stack[-1] += elapsed
+
+    def take(self):
+        stages, calls = self.stages, self.calls
+        self.stages, self.calls = {}, {}
+        return stages, calls
+
+def timed(stage, func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return recorder.call(stage, func, *args, **kwargs)
+    return wrapper
+
+def timed_generator(stage, func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        iterator = func(*args, **kwargs)
+        while True:
+            try:
+                item = recorder.call(stage, next, iterator)
+            except StopIteration:
+                return
+            yield item
+    return wrapper
+
+def enable():
+    global recorder
+    if recorder is not None:
+        return recorder
+    recorder = Recorder()
+    for name, (stage, is_generator) in TIMED_FUNCTIONS.items():
+        func = getattr(markdown_helpers, name)
+        originals[name] = func
+        setattr(markdown_helpers, name, timed_generator(stage, func) if is_generator else timed(stage, func))
+    return recorder
+
+def disable():
+    global recorder
+    for name, func in originals.items():
+        setattr(markdown_helpers, name, func)
+    originals.clear()
+    recorder = None
+
+def count_nodes(node):
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        if node.children:
+            stack.extend(node.children)
+    return count
+
+# Blocks served by the block cache and pages served by the parse cache skip
+# the parsing stages, so stage times and node counts cover cache misses only.
+# The cache section counts hits and misses so reports from warm and cold runs
+# can be told apart.
+class BuildReport:
+    def __init__(self, top=20):
+        self.top = top
+        self.pages = 0
+        self.seconds = 0.0
+        self.stages = {}
+        self.calls = {}
+        self.nodes = 0
+        self.output_bytes = 0
+        self.cache = {}
+        self.slowest = []
+
+    def add(self, stats):
+        self.pages += 1
+        self.seconds += stats["seconds"]
+        self.nodes += stats["nodes"]
+        self.output_bytes += stats["output_bytes"]
+        for stage, seconds in stats["stages"].items():
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        for stage, calls in stats["calls"].items():
+            self.calls[stage] = self.calls.get(stage, 0) + calls
+        for key, count in stats.get("cache", {}).items():
+            self.cache[key] = self.cache.get(key, 0) + count
+        entry = (stats["seconds"], stats["page"], stats)
+        if len(self.slowest) < self.top:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def to_dict(self):
+        return {
+            "pages": self.pages,
+            "seconds": self.seconds,
+            "nodes": self.nodes,
+            "output_bytes": self.output_bytes,
+            "cache": dict(sorted(self.cache.items())),
+            "stages": {
+                stage: {"seconds": seconds, "calls": self.calls.get(stage, 0)}
+                for stage, seconds in sorted(self.stages.items())
+            },
+            "slowest_pages": [stats for _, _, stats in sorted(self.slowest, reverse=True)],
+        }
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
@@ -0,0 +1,98 @@
+import json
+import os
+import posixpath
+from urllib.parse import unquote, urlsplit
+
+from textnode import TextType
+
+LINK_TYPES = {TextType.LINK: "link", TextType.IMAGE: "image"}
+
+def page_links(text_nodes):
+    return [(LINK_TYPES[node.text_type], node.url, node.text) for node in text_nodes if node.text_type in LINK_TYPES]
+
+def output_key(path):
+    return path.replace(os.sep, "/")
+
+def find_outputs(output_dir):
+    outputs = set()
+    for root, dirs, files in os.walk(output_dir):
+        for name in files:
+            outputs.add(output_key(os.path.relpath(os.path.join(root, name), output_dir)))
+    return outputs
+
+# Maps a url found on page to the output path it points at, or None for
+# external links and same-page anchors. Escaping the site root yields "..".
+def resolve_url(page, url):
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = unquote(parts.path)
+    if path.startswith("/"):
+        target = path.lstrip("/")
+    else:
+        target = posixpath.join(posixpath.dirname(page), path)
+    if target == "" or target.endswith("/"):
+        target += "index.html"
+    target = posixpath.normpath(target)
+    if target == ".." or target.startswith("../"):
+        return ".."
+    return target
+
+def target_exists(target, outputs):
+    if target in outputs:
+        return True
+    if posixpath.splitext(target)[1]:
+        return False
+    return target + ".html" in outputs or target + "/index.html" in outputs
+
+# Page outputs to the (kind, url, text) of every link and image on them. It is
+# kept between builds so pages skipped as unchanged keep their links.
+class LinkGraph:
+    def __init__(self, pages=None):
+        self.pages = pages if pages is not None else {}
+
+    def add(self, page, links):
+        self.pages[output_key(page)] = [tuple(link) for link in links]
+
+    def remove(self, page):
+        self.pages.pop(output_key(page), None)
+
+    def __contains__(self, page):
+        return output_key(page) in self.pages
+
+    def edges(self):
+        for page in sorted(self.pages):
+            for kind, url, text in self.pages[page]:
+                yield page, kind, url, text
+
+    def check(self, outputs):
+        broken = []
+        for page, kind, url, text in self.edges():
+            target = resolve_url(page, url)
+            if target is not None and not target_exists(target, outputs):
+                broken.append({"page": page, "kind": kind, "url": url, "text": text})
+        return broken
+
+    def to_dict(self):
+        return {
+            page: [{"kind": kind, "url": url, "text": text} for kind, url, text in links]
+            for page, links in sorted(self.pages.items())
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls({page: [(link["kind"], link["url"], link["text"]) for link in links] for page, links in data.items()})
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=1)
+        os.replace(tmp_path, path)
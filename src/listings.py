@@ -0,0 +1,178 @@
+import json
+import os
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from html import escape
+
+from build import commit_output, default_title, remove_output, save_manifest, temp_output_path
+from front_matter import load_front_matter
+from htmlnode import LeafNode, ParentNode
+
+SLUG_PATTERN = re.compile(r"[^a-z0-9]+")
+
+def slugify(text):
+    return SLUG_PATTERN.sub("-", text.lower()).strip("-") or "untitled"
+
+def page_url(output):
+    output = output.replace(os.sep, "/")
+    if output == "index.html" or output.endswith("/index.html"):
+        return "/" + output[:-len("index.html")]
+    return "/" + output
+
+def listing_output(directory, number):
+    if number == 1:
+        return f"{directory}/index.html"
+    return f"{directory}/page/{number}/index.html"
+
+def parse_date(value):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+def meta_tags(meta):
+    tags = meta.get("tags", [])
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in tags.split(",") if tag.strip()]
+    return tags
+
+def listing_node(entries, previous_url, next_url):
+    items = []
+    for entry in entries:
+        items.append(ParentNode("li", [
+            LeafNode("a", escape(entry["title"]), {"href": page_url(entry["output"])}),
+            LeafNode("time", escape(entry["meta"]["date"])),
+        ]))
+    links = []
+    if previous_url is not None:
+        links.append(LeafNode("a", "Newer", {"href": previous_url, "rel": "prev"}))
+    if next_url is not None:
+        links.append(LeafNode("a", "Older", {"href": next_url, "rel": "next"}))
+    children = [ParentNode("ul", items)]
+    if links:
+        children.append(ParentNode("nav", links))
+    return ParentNode("div", children)
+
+def write_streamed(dest_path, chunks):
+    tmp_path = temp_output_path(dest_path)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write(chunk)
+    return commit_output(tmp_path, dest_path)
+
+# Front matter of every page, read from file headers only and kept between
+# builds keyed by source digest. Listing pages, tag pages, sitemap.xml and
+# feed.xml are generated from it without parsing any page bodies.
+class MetadataIndex:
+    def __init__(self, path, site_url="", page_size=10, feed_size=20, title="Posts"):
+        self.path = path
+        self.site_url = site_url.rstrip("/")
+        self.page_size = page_size
+        self.feed_size = feed_size
+        self.title = title
+        self.pages = {}
+        self.generated = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self.pages = data["pages"]
+            self.generated = data["generated"]
+        self.updated = {}
+
+    def update(self, page, source_path, entry):
+        previous = self.pages.get(page)
+        if previous is not None and previous["source"] == entry["source"]:
+            meta = previous["meta"]
+        else:
+            meta = load_front_matter(source_path)
+        self.updated[page] = {"source": entry["source"], "output": entry["output"].replace(os.sep, "/"), "meta": meta}
+
+    def entries(self, pages=None):
+        pages = self.pages if pages is None else pages
+        for page in sorted(pages):
+            entry = pages[page]
+            if str(entry["meta"].get("draft", "")).lower() != "true":
+                yield dict(entry, title=entry["meta"].get("title") or default_title(page))
+
+    def posts(self, pages=None):
+        posts = [entry for entry in self.entries(pages) if entry["meta"].get("date")]
+        posts.sort(key=lambda entry: (entry["meta"]["date"], entry["output"]), reverse=True)
+        return posts
+
+    def write(self, output_dir, template=None):
+        self.pages, self.updated = self.updated, {}
+        statuses = {}
+        posts = self.posts()
+        for directory, title, entries in self.listings(posts):
+            statuses.update(self.write_listing(output_dir, template, directory, title, entries))
+        statuses["sitemap.xml"] = write_streamed(os.path.join(output_dir, "sitemap.xml"), self.iter_sitemap())
+        statuses["feed.xml"] = write_streamed(os.path.join(output_dir, "feed.xml"), self.iter_feed(posts[:self.feed_size]))
+
+        for output in self.generated:
+            if output not in statuses and remove_output(output_dir, output):
+                statuses[output] = "deleted"
+        self.generated = sorted(output for output, status in statuses.items() if status != "deleted")
+        save_manifest(self.path, {"pages": self.pages, "generated": self.generated})
+        return statuses
+
+    def listings(self, posts):
+        yield "posts", self.title, posts
+        tags = {}
+        for entry in posts:
+            for tag in meta_tags(entry["meta"]):
+                tags.setdefault(tag, []).append(entry)
+        for tag in sorted(tags):
+            yield f"tags/{slugify(tag)}", f"{self.title} tagged {tag}", tags[tag]
+
+    # Paths the next write will generate for the pages passed to update, so
+    # they can be checked against the rendered pages before anything is written.
+    def outputs(self):
+        outputs = {"sitemap.xml", "feed.xml"}
+        for directory, _, entries in self.listings(self.posts(self.updated)):
+            for number in range(1, (len(entries) + self.page_size - 1) // self.page_size + 1):
+                outputs.add(listing_output(directory, number))
+        return outputs
+
+    def write_listing(self, output_dir, template, directory, title, entries):
+        statuses = {}
+        pages = [entries[i:i + self.page_size] for i in range(0, len(entries), self.page_size)]
+        for number, chunk in enumerate(pages, 1):
+            previous_url = page_url(listing_output(directory, number - 1)) if number > 1 else None
+            next_url = page_url(listing_output(directory, number + 1)) if number < len(pages) else None
+            node = listing_node(chunk, previous_url, next_url)
+            page_title = title if number == 1 else f"{title}, page {number}"
+            output = listing_output(directory, number)
+            if template is None:
+                chunks = node.iter_html()
+            else:
+                chunks = template.iter_render({"Title": escape(page_title), "Content": node})
+            statuses[output] = write_streamed(os.path.join(output_dir, output), chunks)
+        return statuses
+
+    def iter_sitemap(self):
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        for entry in self.entries():
+            yield f"<url><loc>{escape(self.site_url + page_url(entry['output']))}</loc>"
+            date = parse_date(entry["meta"].get("updated") or entry["meta"].get("date"))
+            if date is not None:
+                yield f"<lastmod>{date.date().isoformat()}</lastmod>"
+            yield "</url>\n"
+        yield "</urlset>\n"
+
+    def iter_feed(self, posts):
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield '<rss version="2.0"><channel>\n'
+        yield f"<title>{escape(self.title)}</title><link>{escape(self.site_url + '/')}</link><description>{escape(self.title)}</description>\n"
+        for entry in posts:
+            url = escape(self.site_url + page_url(entry["output"]))
+            yield f"<item><title>{escape(entry['title'])}</title><link>{url}</link><guid>{url}</guid>"
+            date = parse_date(entry["meta"]["date"])
+            if date is not None:
+                yield f"<pubDate>{format_datetime(date if date.tzinfo else date.replace(tzinfo=timezone.utc))}</pubDate>"
+            description = entry["meta"].get("description")
+            if description:
+                yield f"<description>{escape(description)}</description>"
+            yield "</item>\n"
+        yield "</channel></rss>\n"
@@ -1,8 +1,145 @@
-from textnode import TextNode, TextType
+import argparse
+import os
 
-def main():
-    node = TextNode("This is some anchor text", TextType.LINK, "https://www.boot.dev")
-    print (node)
+from assets import AssetSync
+from build import build_site, merge_changes
+from compress import compress_outputs
+from daemon import BuildDaemon, run_daemon
+from image_size import ImageSizes
+from instrument import BuildReport
+from links import LinkGraph, find_outputs
+from listings import MetadataIndex
+from search_index import SearchIndex
+from template import load_template
+from serve import serve
+
+def cache_options_from_args(args):
+    if args.block_cache_size <= 0:
+        return None
+    cache_options = {"max_entries": args.block_cache_size}
+    if args.shared_block_cache:
+        os.makedirs(args.cache_dir, exist_ok=True)
+        cache_options["path"] = os.path.join(args.cache_dir, "blocks.sqlite3")
+    return cache_options
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    site_parser = argparse.ArgumentParser(add_help=False)
+    site_parser.add_argument("--content", default="content", help="directory of markdown sources")
+    site_parser.add_argument("--output", default="public", help="directory to write html into")
+    site_parser.add_argument("--template", default="template.html", help="page template with {{ Title }} and {{ Content }} slots, used when it exists")
+    site_parser.add_argument("--cache-dir", default=".cache", help="directory for the build manifest and caches")
+    site_parser.add_argument("--changes", help="where to write the added, modified and deleted output paths of each build, defaults to changes.json in the cache dir")
+    site_parser.add_argument("--static", default="static", help="directory of static assets mirrored into the output, used when it exists")
+    site_parser.add_argument("--hardlink-static", action="store_true", help="hardlink static assets into the output instead of copying them")
+    site_parser.add_argument("--zero-copy-threshold", type=int, default=1 << 20, help="static assets at least this many bytes are copied inside the kernel")
+    site_parser.add_argument("--parse-cache", action="store_true", help="keep parsed blocks and inline nodes on disk between runs")
+    site_parser.add_argument("--stream-threshold", type=int, default=8 << 20, help="sources larger than this many bytes are converted block by block, -1 disables")
+    site_parser.add_argument("--block-cache-size", type=int, default=4096, help="rendered blocks kept in memory per worker, 0 disables")
+    site_parser.add_argument("--shared-block-cache", action="store_true", help="also share rendered blocks between workers and runs on disk")
+
+    build_parser = subparsers.add_parser("build", parents=[site_parser], help="render a content tree of markdown into html")
+    build_parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    build_parser.add_argument("--parallel-threshold", type=int, default=1 << 20, help="sources at least this many bytes have their blocks rendered across the pool, -1 disables")
+    build_parser.add_argument("--gzip", action="store_true", help="write .gz companions for text outputs")
+    build_parser.add_argument("--gzip-level", type=int, default=9, help="zlib compression level for --gzip")
+    build_parser.add_argument("--check-links", action="store_true", help="record links and images while parsing and report those pointing at missing outputs")
+    build_parser.add_argument("--link-graph", help="also export the recorded link graph as json to this path, implies --check-links")
+    build_parser.add_argument("--search-index", action="store_true", help="write a sharded inverted index of page text into the search directory of the output")
+    build_parser.add_argument("--search-prefix-length", type=int, default=2, help="characters of each term used to pick its index shard")
+    build_parser.add_argument("--listings", action="store_true", help="generate paginated post and tag listings, sitemap.xml and feed.xml from page front matter")
+    build_parser.add_argument("--site-url", default="", help="absolute site url used in sitemap.xml and feed.xml")
+    build_parser.add_argument("--page-size", type=int, default=10, help="posts per listing page")
+    build_parser.add_argument("--feed-size", type=int, default=20, help="most recent posts included in feed.xml")
+    build_parser.add_argument("--image-sizes", action="store_true", help="add width and height to local images by reading their file headers")
+    build_parser.add_argument("--image-root", action="append", default=[], help="extra directory that image urls resolve into, after the output directory")
+    build_parser.add_argument("--report", help="write per-stage timings and the slowest pages as json to this path; blocks served by the block or parse cache are counted but not timed")
+    build_parser.add_argument("--report-top", type=int, default=20, help="number of slowest pages to include in the report")
+
+    serve_parser = subparsers.add_parser("serve", parents=[site_parser], help="serve the output directory over http")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    serve_parser.add_argument("--port", type=int, default=8888, help="port to listen on")
+    serve_parser.add_argument("--watch", action="store_true", help="rebuild changed pages while serving")
+    serve_parser.add_argument("--interval", type=float, default=0.2, help="seconds between content scans")
+
+    daemon_parser = subparsers.add_parser("daemon", parents=[site_parser], help="keep the site loaded and answer build and render requests on a unix socket")
+    daemon_parser.add_argument("--socket", help="unix socket to listen on, defaults to daemon.sock in the cache dir")
+
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.content) and (args.command in ("build", "daemon") or getattr(args, "watch", False)):
+        parser.error(f"content directory not found: {args.content}")
+    template_path = args.template if os.path.isfile(args.template) else None
+    template = load_template(template_path) if template_path is not None else None
+    build_options = {
+        "manifest_path": os.path.join(args.cache_dir, "build-manifest.json"),
+        "changes_path": args.changes or os.path.join(args.cache_dir, "changes.json"),
+        "cache_options": cache_options_from_args(args),
+        "parse_cache_dir": os.path.join(args.cache_dir, "parsed") if args.parse_cache else None,
+        "stream_threshold": args.stream_threshold if args.stream_threshold >= 0 else None,
+        "assets": AssetSync(args.static, os.path.join(args.cache_dir, "static-manifest.json"), args.hardlink_static, args.zero_copy_threshold),
+    }
+
+    if args.command == "build":
+        if args.jobs < 1:
+            parser.error("--jobs must be at least 1")
+        if args.page_size < 1:
+            parser.error("--page-size must be at least 1")
+        report = BuildReport(args.report_top) if args.report else None
+        parallel_threshold = args.parallel_threshold if args.parallel_threshold >= 0 else None
+        link_graph_path = os.path.join(args.cache_dir, "link-graph.json")
+        link_graph = LinkGraph.load(link_graph_path) if args.check_links or args.link_graph else None
+        search_index = SearchIndex(os.path.join(args.cache_dir, "search"), prefix_length=args.search_prefix_length) if args.search_index else None
+        image_sizes = ImageSizes([args.output] + args.image_root, os.path.join(args.cache_dir, "image-sizes.json")) if args.image_sizes else None
+        metadata_index = MetadataIndex(os.path.join(args.cache_dir, "metadata.json"), args.site_url, args.page_size, args.feed_size) if args.listings else None
+        try:
+            written = build_site(
+                args.content,
+                args.output,
+                args.jobs,
+                report=report,
+                template=template,
+                parallel_threshold=parallel_threshold,
+                link_graph=link_graph,
+                search_index=search_index,
+                metadata_index=metadata_index,
+                image_sizes=image_sizes,
+                **build_options,
+            )
+        except RuntimeError as error:
+            parser.exit(1, f"{error}\n")
+        print(f"Built {len(written)} changed outputs into {args.output}")
+        if args.gzip:
+            manifest_path = os.path.join(args.cache_dir, "gzip-manifest.json")
+            summary = compress_outputs(args.output, args.jobs, manifest_path, args.gzip_level)
+            merge_changes(build_options["changes_path"], summary["statuses"])
+            print(f"Compressed {summary['compressed']} files ({summary['skipped']} unchanged), saving {summary['saved_bytes']} bytes")
+        if report is not None:
+            report.write(args.report)
+        if link_graph is not None:
+            link_graph.write(link_graph_path)
+            if args.link_graph:
+                link_graph.write(args.link_graph)
+            broken = link_graph.check(find_outputs(args.output))
+            for link in broken:
+                print(f"Broken {link['kind']} on {link['page']}: {link['url']} ({link['text']})")
+            if broken:
+                parser.exit(1, f"{len(broken)} broken links\n")
+
+    elif args.command == "serve":
+        if args.watch:
+            try:
+                written = build_site(args.content, args.output, os.cpu_count() or 1, template=template, **build_options)
+            except RuntimeError as error:
+                parser.exit(1, f"{error}\n")
+            print(f"Built {len(written)} changed outputs into {args.output}")
+        serve(args.content, args.output, build_options, args.host, args.port, args.interval, args.watch, template_path)
+
+    elif args.command == "daemon":
+        socket_path = args.socket or os.path.join(args.cache_dir, "daemon.sock")
+        run_daemon(socket_path, BuildDaemon(args.content, args.output, build_options, args.template))
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,7 @@
 from enum import Enum
 import re
-from htmlnode import HTMLNode, text_node_to_html_node
+import htmlnode
+from htmlnode import HTMLNode, LeafNode, ParentNode, text_node_to_html_node, text_nodes_to_html
 from textnode import text_to_textnodes, TextNode, TextType
 
 class BlockType(Enum):
@@ -16,19 +17,43 @@ def markdown_to_blocks(markdown):
     blocks = [block.strip() for block in blocks if block.strip()]
     return blocks
 
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+.*$')
+
+def iter_blocks(lines):
+    block = []
+    for line in lines:
+        if line.endswith("\n"):
+            line = line[:-1]
+        if line:
+            if block or line.strip():
+                block.append(line)
+        elif block:
+            yield finish_block(block)
+            block = []
+    if block:
+        yield finish_block(block)
+
+def finish_block(lines):
+    while not lines[-1].strip():
+        lines.pop()
+    lines[0] = lines[0].lstrip()
+    lines[-1] = lines[-1].rstrip()
+    return lines_to_block_type(lines), lines
+
 def block_to_block_type(block):
-    block = block.strip()
-    lines = block.splitlines()
-    non_empty_lines = [line.strip() for line in lines if line.strip()]
+    return lines_to_block_type(block.strip().splitlines())
+
+def lines_to_block_type(lines):
+    stripped_lines = [line.strip() for line in lines]
+    non_empty_lines = [line for line in stripped_lines if line]
 
-    if len(lines) >= 2 and lines[0].strip().startswith("```") and lines[-1].strip().startswith("```"):
+    if len(lines) >= 2 and stripped_lines[0].startswith("```") and stripped_lines[-1].startswith("```"):
         return BlockType.CODE
 
     if not non_empty_lines:
         return BlockType.PARAGRAPH
 
-    heading_pattern = r'^(#{1,6})\s+.*$'
-    if re.match(heading_pattern, non_empty_lines[0]):
+    if HEADING_PATTERN.match(non_empty_lines[0]):
         return BlockType.HEADING
 
     if all(line.startswith(">") for line in non_empty_lines):
@@ -45,77 +70,136 @@ def block_to_block_type(block):
 
     return BlockType.PARAGRAPH
 
+# When set, called with the TextNodes of every inline span as it is parsed.
+inline_observer = None
+
 def text_to_children(text):
     text_nodes = text_to_textnodes(text)
+    if inline_observer is not None:
+        inline_observer(text_nodes)
     child_nodes = []
     for text_node in text_nodes:
         html_node = text_node_to_html_node(text_node)
         child_nodes.append(html_node)
     return child_nodes
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    block_nodes = []
+def text_to_fused_children(text):
+    text_nodes = text_to_textnodes(text)
+    if inline_observer is not None:
+        inline_observer(text_nodes)
+    return [LeafNode(None, text_nodes_to_html(text_nodes))]
 
-    for block in blocks:
-        block_type = block_to_block_type(block)
+def markdown_to_html_node(markdown, cache=None, fused=False):
+    block_nodes = list(iter_block_nodes(markdown.split("\n"), cache, fused))
+    parent_node = ParentNode(tag="div", children=block_nodes)
+    return parent_node
 
+# With fused set, inline spans of non-heading blocks are rendered straight to
+# markup; headings keep real nodes so the page title can still be read.
+# Cached blocks are never parsed, so the cache is bypassed while observing
+# and for images, whose sizes depend on the page and the files on disk.
+def iter_block_nodes(lines, cache=None, fused=False):
+    for block_type, block_lines in iter_blocks(lines):
+        block = "\n".join(block_lines)
         if block_type == BlockType.HEADING:
-            count = 0
-            for char in block:
-                if char == "#":
-                    count += 1
-                else:
-                    break
-
-            clean_text = block.lstrip('# ').rstrip()
-
-            tag = f"h{count}" if 1 <= count <= 6 else "p"
-            child_nodes = text_to_children(clean_text)
-            heading_node = HTMLNode(tag=tag, children=child_nodes)
-            block_nodes.append(heading_node)
-
-        elif block_type == BlockType.CODE:
-            clean_text = block.strip()[3:-3].lstrip('\n')
-            text_node = TextNode(clean_text, TextType.TEXT)
-            code_content_node = text_node_to_html_node(text_node)
-            code_node = HTMLNode(tag="code", children=[code_content_node])
-            pre_node = HTMLNode(tag="pre", children=[code_node])
-            block_nodes.append(pre_node)
-
-        elif block_type == BlockType.QUOTE:
-            clean_text = "\n".join(line.lstrip("> ") for line in block.splitlines())
-            child_nodes = text_to_children(clean_text)
-            quote_node = HTMLNode(tag="blockquote", children=child_nodes)
-            block_nodes.append(quote_node)
-
-        elif block_type == BlockType.UNORDERED_LIST:
-            items = block.splitlines()
-            li_nodes = []
-            for item in items:
-                clean_item = item.lstrip('*-+ ').strip()
-                child_nodes = text_to_children(clean_item)
-                li_node = HTMLNode(tag="li", children=child_nodes)
-                li_nodes.append(li_node)
-            ul_node = HTMLNode(tag="ul", children=li_nodes)
-            block_nodes.append(ul_node)
-
-        elif block_type == BlockType.ORDERED_LIST:
-            items = block.splitlines()
-            li_nodes = []
-            for item in items:
-                clean_item = item.split('. ', 1)[1] if '. ' in item else item.strip()
-                child_nodes = text_to_children(clean_item)
-                li_node = HTMLNode(tag="li", children=child_nodes)
-                li_nodes.append(li_node)
-            ol_node = HTMLNode(tag="ol", children=li_nodes)
-            block_nodes.append(ol_node)
-
-        else:
-            clean_block = block.replace('\n', ' ')
-            child_nodes = text_to_children(clean_block)
-            paragraph_node = HTMLNode(tag="p", children=child_nodes)
-            block_nodes.append(paragraph_node)
-
-    parent_node = HTMLNode(tag="div", children=block_nodes)
-    return parent_node
+            yield block_to_html_node(block, block_type)
+            continue
+        if cache is None or inline_observer is not None or (htmlnode.image_props is not None and "![" in block):
+            yield block_to_html_node(block, block_type, text_to_fused_children if fused else None)
+            continue
+        html = cache.get(block_type, block)
+        if html is None:
+            html = block_to_html_node(block, block_type, text_to_fused_children).to_html()
+            cache.put(block_type, block, html)
+        yield LeafNode(None, html)
+
+def render_block_chunk(chunk):
+    return "".join(block_to_html_node(block, block_type, text_to_fused_children).to_html() for block_type, block in chunk)
+
+# Shards the blocks of one document across a process pool (anything with an
+# order-preserving map) and stitches the fragments back in document order.
+def markdown_to_html_node_parallel(markdown, pool, chunk_size=64, min_blocks=256):
+    blocks = [(block_type, "\n".join(lines)) for block_type, lines in iter_blocks(markdown.split("\n"))]
+    if len(blocks) < min_blocks:
+        block_nodes = [block_to_html_node(block, block_type) for block_type, block in blocks]
+        return ParentNode(tag="div", children=block_nodes)
+    chunks = [blocks[i:i + chunk_size] for i in range(0, len(blocks), chunk_size)]
+    fragments = pool.map(render_block_chunk, chunks)
+    return ParentNode(tag="div", children=[LeafNode(None, fragment) for fragment in fragments])
+
+# Renders a document one block at a time from any line iterator, such as an
+# open file, so memory is bounded by the largest block rather than the page.
+class StreamedDocument:
+    def __init__(self, lines, cache=None):
+        self.lines = lines
+        self.cache = cache
+
+    def iter_html(self):
+        yield "<div>"
+        for node in iter_block_nodes(self.lines, self.cache, fused=True):
+            yield from node.iter_html()
+        yield "</div>"
+
+    def write_html(self, fp):
+        for chunk in self.iter_html():
+            fp.write(chunk)
+
+def block_to_html_node(block, block_type, to_children=None):
+    if to_children is None:
+        to_children = text_to_children
+    if block_type == BlockType.HEADING:
+        count = 0
+        for char in block:
+            if char == "#":
+                count += 1
+            else:
+                break
+
+        clean_text = block.lstrip('# ').rstrip()
+
+        tag = f"h{count}" if 1 <= count <= 6 else "p"
+        child_nodes = to_children(clean_text)
+        heading_node = HTMLNode(tag=tag, children=child_nodes)
+        return heading_node
+
+    elif block_type == BlockType.CODE:
+        clean_text = block.strip()[3:-3].lstrip('\n')
+        text_node = TextNode(clean_text, TextType.TEXT)
+        code_content_node = text_node_to_html_node(text_node)
+        code_node = HTMLNode(tag="code", children=[code_content_node])
+        pre_node = HTMLNode(tag="pre", children=[code_node])
+        return pre_node
+
+    elif block_type == BlockType.QUOTE:
+        clean_text = "\n".join(line.lstrip("> ") for line in block.splitlines())
+        child_nodes = to_children(clean_text)
+        quote_node = HTMLNode(tag="blockquote", children=child_nodes)
+        return quote_node
+
+    elif block_type == BlockType.UNORDERED_LIST:
+        items = block.splitlines()
+        li_nodes = []
+        for item in items:
+            clean_item = item.lstrip('*-+ ').strip()
+            child_nodes = to_children(clean_item)
+            li_node = HTMLNode(tag="li", children=child_nodes)
+            li_nodes.append(li_node)
+        ul_node = HTMLNode(tag="ul", children=li_nodes)
+        return ul_node
+
+    elif block_type == BlockType.ORDERED_LIST:
+        items = block.splitlines()
+        li_nodes = []
+        for item in items:
+            clean_item = item.split('. ', 1)[1] if '. ' in item else item.strip()
+            child_nodes = to_children(clean_item)
+            li_node = HTMLNode(tag="li", children=child_nodes)
+            li_nodes.append(li_node)
+        ol_node = HTMLNode(tag="ol", children=li_nodes)
+        return ol_node
+
+    else:
+        clean_block = block.replace('\n', ' ')
+        child_nodes = to_children(clean_block)
+        paragraph_node = HTMLNode(tag="p", children=child_nodes)
+        return paragraph_node
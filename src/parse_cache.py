@@ -0,0 +1,122 @@
+import hashlib
+import marshal
+import os
+import shutil
+import sys
+import zlib
+
+import front_matter
+import markdown_helpers
+import textnode
+from htmlnode import LeafNode, ParentNode, text_node_to_html_node, text_nodes_to_html
+from markdown_helpers import BlockType, block_to_html_node, iter_blocks
+from textnode import TextNode, TextType, text_to_textnodes
+
+BLOCK_TYPES = list(BlockType)
+TEXT_TYPES = list(TextType)
+
+def modules_version(modules, seed):
+    digest = hashlib.sha256(seed.encode("utf-8"))
+    for module in modules:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+# Cached blocks are parsed from the body left once split_front_matter has
+# stripped the header, so the front matter splitter is hashed with the parser.
+def parser_version():
+    return modules_version((front_matter, textnode, markdown_helpers, sys.modules[__name__]), f"{sys.version_info[0]}.{sys.version_info[1]}")
+
+PARSER_VERSION = parser_version()
+
+# Parses markdown into the page tree and also returns the intermediate
+# blocks: (BlockType, block text, [TextNode list per inline span]).
+def parse_markdown(markdown):
+    block_nodes = []
+    blocks = []
+    for block_type, lines in iter_blocks(markdown.split("\n")):
+        block = "\n".join(lines)
+        inline = []
+
+        def to_children(text):
+            text_nodes = text_to_textnodes(text)
+            inline.append(text_nodes)
+            if markdown_helpers.inline_observer is not None:
+                markdown_helpers.inline_observer(text_nodes)
+            return [text_node_to_html_node(text_node) for text_node in text_nodes]
+
+        block_nodes.append(block_to_html_node(block, block_type, to_children))
+        blocks.append((block_type, block, inline))
+    return ParentNode(tag="div", children=block_nodes), blocks
+
+def blocks_to_html_node(blocks, fused=False):
+    block_nodes = []
+    observer = markdown_helpers.inline_observer
+    for block_type, block, inline in blocks:
+        if observer is not None:
+            for text_nodes in inline:
+                observer(text_nodes)
+        pending = iter(inline)
+        if fused and block_type != BlockType.HEADING:
+            to_children = lambda text: [LeafNode(None, text_nodes_to_html(next(pending)))]
+        else:
+            to_children = lambda text: [text_node_to_html_node(text_node) for text_node in next(pending)]
+        block_nodes.append(block_to_html_node(block, block_type, to_children))
+    return ParentNode(tag="div", children=block_nodes)
+
+def encode_blocks(blocks):
+    block_index = {block_type: i for i, block_type in enumerate(BLOCK_TYPES)}
+    text_index = {text_type: i for i, text_type in enumerate(TEXT_TYPES)}
+    data = tuple(
+        (
+            block_index[block_type],
+            block,
+            tuple(
+                tuple((node.text, text_index[node.text_type], node.url) for node in text_nodes)
+                for text_nodes in inline
+            ),
+        )
+        for block_type, block, inline in blocks
+    )
+    return zlib.compress(marshal.dumps(data), 1)
+
+def decode_blocks(payload):
+    return [
+        (
+            BLOCK_TYPES[block_type],
+            block,
+            [[TextNode(text, TEXT_TYPES[text_type], url) for text, text_type, url in text_nodes] for text_nodes in inline],
+        )
+        for block_type, block, inline in marshal.loads(zlib.decompress(payload))
+    ]
+
+class ParseCache:
+    def __init__(self, directory):
+        self.directory = os.path.join(directory, PARSER_VERSION)
+        self.hits = 0
+        self.misses = 0
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if name != PARSER_VERSION:
+                    shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+    def entry_path(self, source_digest):
+        return os.path.join(self.directory, source_digest[:2], source_digest + ".bin")
+
+    def load(self, source_digest):
+        try:
+            with open(self.entry_path(source_digest), "rb") as f:
+                blocks = decode_blocks(f.read())
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return blocks
+
+    def store(self, source_digest, blocks):
+        path = self.entry_path(source_digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(encode_blocks(blocks))
+        os.replace(tmp_path, path)
@@ -0,0 +1,147 @@
+import json
+import marshal
+import os
+import re
+import shutil
+import zlib
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Observes a page's inline spans and numbers every token in reading order.
+class PageTerms:
+    def __init__(self):
+        self.position = 0
+        self.postings = {}
+
+    def add(self, text_nodes):
+        for node in text_nodes:
+            for term in TOKEN_PATTERN.findall(node.text.lower()):
+                positions = self.postings.get(term)
+                if positions is None:
+                    self.postings[term] = [self.position]
+                else:
+                    positions.append(self.position)
+                self.position += 1
+
+def page_terms_path(directory, source_digest):
+    return os.path.join(directory, "pages", source_digest[:2], source_digest + ".bin")
+
+def store_page_terms(directory, source_digest, postings):
+    path = page_terms_path(directory, source_digest)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(zlib.compress(marshal.dumps(postings), 1))
+    os.replace(tmp_path, path)
+
+def load_page_terms(directory, source_digest):
+    with open(page_terms_path(directory, source_digest), "rb") as f:
+        return marshal.loads(zlib.decompress(f.read()))
+
+def delta_encode(positions):
+    previous = 0
+    deltas = []
+    for position in positions:
+        deltas.append(position - previous)
+        previous = position
+    return deltas
+
+def write_if_changed(path, data):
+    exists = os.path.exists(path)
+    if exists and os.path.getsize(path) == len(data):
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return "unchanged"
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return "modified" if exists else "added"
+
+def encode_json(value):
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, sort_keys=True).encode("utf-8")
+
+# Page postings are kept per source digest in the cache, so pages skipped as
+# unchanged are indexed without being parsed again. Writing merges them into
+# one shard per term prefix; at most max_buffered postings are held in memory
+# before they are spilled to run files that are merged shard by shard.
+class SearchIndex:
+    def __init__(self, directory, output="search", prefix_length=2, max_buffered=1 << 20):
+        self.directory = directory
+        self.output = output
+        self.prefix_length = prefix_length
+        self.max_buffered = max_buffered
+
+    def has(self, source_digest):
+        return os.path.exists(page_terms_path(self.directory, source_digest))
+
+    def write(self, pages, output_dir):
+        runs_dir = os.path.join(self.directory, "runs")
+        shutil.rmtree(runs_dir, ignore_errors=True)
+        urls = []
+        prefixes = set()
+        buffer = {}
+        buffered = 0
+        runs = 0
+        for page_id, (output, source_digest) in enumerate(pages):
+            urls.append("/" + output.replace(os.sep, "/"))
+            for term, positions in load_page_terms(self.directory, source_digest).items():
+                prefix = term[:self.prefix_length]
+                buffer.setdefault(prefix, {}).setdefault(term, []).append([page_id, delta_encode(positions)])
+                buffered += len(positions) + 1
+            if buffered >= self.max_buffered:
+                prefixes.update(buffer)
+                self.spill(runs_dir, runs, buffer)
+                runs += 1
+                buffer = {}
+                buffered = 0
+
+        index_dir = os.path.join(output_dir, self.output)
+        shards_dir = os.path.join(index_dir, "terms")
+        os.makedirs(shards_dir, exist_ok=True)
+        statuses = {}
+        prefixes.update(buffer)
+        for prefix in sorted(prefixes):
+            shard = {}
+            for run in range(runs):
+                for term, postings in self.load_run(runs_dir, run, prefix).items():
+                    shard.setdefault(term, []).extend(postings)
+            for term, postings in buffer.get(prefix, {}).items():
+                shard.setdefault(term, []).extend(postings)
+            name = prefix + ".json"
+            statuses[os.path.join(self.output, "terms", name)] = write_if_changed(os.path.join(shards_dir, name), encode_json(shard))
+        for name in os.listdir(shards_dir):
+            if name[:-len(".json")] not in prefixes:
+                os.remove(os.path.join(shards_dir, name))
+                statuses[os.path.join(self.output, "terms", name)] = "deleted"
+        shutil.rmtree(runs_dir, ignore_errors=True)
+
+        statuses[os.path.join(self.output, "index.json")] = write_if_changed(
+            os.path.join(index_dir, "index.json"),
+            encode_json({"prefix_length": self.prefix_length, "pages": urls, "shards": sorted(prefixes)}),
+        )
+        self.prune({source_digest for _, source_digest in pages})
+        return statuses
+
+    def spill(self, runs_dir, run, buffer):
+        run_dir = os.path.join(runs_dir, str(run))
+        os.makedirs(run_dir, exist_ok=True)
+        for prefix, terms in buffer.items():
+            with open(os.path.join(run_dir, prefix + ".bin"), "wb") as f:
+                marshal.dump(terms, f)
+
+    def load_run(self, runs_dir, run, prefix):
+        path = os.path.join(runs_dir, str(run), prefix + ".bin")
+        if not os.path.exists(path):
+            return {}
+        with open(path, "rb") as f:
+            return marshal.load(f)
+
+    def prune(self, source_digests):
+        pages_dir = os.path.join(self.directory, "pages")
+        if not os.path.isdir(pages_dir):
+            return
+        for bucket in os.listdir(pages_dir):
+            for name in os.listdir(os.path.join(pages_dir, bucket)):
+                if name[:-len(".bin")] not in source_digests:
+                    os.remove(os.path.join(pages_dir, bucket, name))
@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from build import build_site
+from template import load_template
+
+# If-None-Match carries a comma separated list of tags, compared weakly, or *.
+def etag_matches(header, etag):
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == "*" or tag == etag:
+            return True
+    return False
+
+class ETagRequestHandler(SimpleHTTPRequestHandler):
+    def send_head(self):
+        self.etag = None
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.split("?", 1)[0].endswith("/"):
+            path = os.path.join(path, "index.html")
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            self.etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+            if etag_matches(self.headers.get("If-None-Match", ""), self.etag):
+                self.send_response(304)
+                self.end_headers()
+                return None
+        return super().send_head()
+
+    def end_headers(self):
+        if getattr(self, "etag", None) is not None:
+            self.send_header("ETag", self.etag)
+            self.send_header("Cache-Control", "no-cache")
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(output_dir, host="127.0.0.1", port=8888):
+    handler = partial(ETagRequestHandler, directory=output_dir)
+    return ThreadingHTTPServer((host, port), handler)
+
+def watched_static_dir(build_options):
+    assets = build_options.get("assets")
+    return assets.static_dir if assets is not None else None
+
+# Markdown sources, the template and every file under the static directory.
+def content_snapshot(content_dir, template_path=None, static_dir=None):
+    snapshot = {}
+    if template_path is not None and os.path.exists(template_path):
+        stat = os.stat(template_path)
+        snapshot[template_path] = (stat.st_mtime_ns, stat.st_size)
+    snapshot_files(snapshot, content_dir, ".md")
+    if static_dir is not None:
+        snapshot_files(snapshot, static_dir, "")
+    return snapshot
+
+def snapshot_files(snapshot, directory, suffix):
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(suffix):
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+
+def watch(content_dir, output_dir, build_options, interval=0.2, stop_event=None, previous=None, template_path=None, on_rebuild=None):
+    if previous is None:
+        previous = content_snapshot(content_dir, template_path, watched_static_dir(build_options))
+    while stop_event is None or not stop_event.is_set():
+        time.sleep(interval)
+        current = content_snapshot(content_dir, template_path, watched_static_dir(build_options))
+        if current == previous:
+            continue
+        previous = current
+        start = time.perf_counter()
+        template = load_template(template_path) if template_path is not None else None
+        written = build_site(content_dir, output_dir, 1, template=template, **build_options)
+        if on_rebuild is not None:
+            on_rebuild(written, time.perf_counter() - start)
+
+def report_rebuild(written, seconds):
+    print(f"Rebuilt {len(written)} changed outputs in {seconds * 1000:.1f} ms")
+
+def serve(content_dir, output_dir, build_options, host="127.0.0.1", port=8888, interval=0.2, watch_content=True, template_path=None):
+    server = make_server(output_dir, host, port)
+    if watch_content:
+        watcher = threading.Thread(
+            target=watch,
+            args=(content_dir, output_dir, build_options, interval, None, content_snapshot(content_dir, template_path, watched_static_dir(build_options)), template_path, report_rebuild),
+            daemon=True,
+        )
+        watcher.start()
+    print(f"Serving {output_dir} on http://{host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import re
+from functools import lru_cache
+from html import escape
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+class Template:
+    def __init__(self, source):
+        self.digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        self.statics = []
+        self.slots = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            self.statics.append(source[position:match.start()])
+            self.slots.append(match.group(1))
+            position = match.end()
+        self.statics.append(source[position:])
+
+    def iter_render(self, values):
+        for static, slot in zip(self.statics, self.slots):
+            yield static
+            value = values.get(slot, "")
+            if hasattr(value, "iter_html"):
+                yield from value.iter_html()
+            else:
+                yield str(value)
+        yield self.statics[-1]
+
+    def render(self, values):
+        return "".join(self.iter_render(values))
+
+    def write(self, fp, values):
+        for chunk in self.iter_render(values):
+            fp.write(chunk)
+
+@lru_cache(maxsize=16)
+def cached_template(path, mtime_ns):
+    with open(path, encoding="utf-8") as f:
+        return Template(f.read())
+
+def load_template(path):
+    return cached_template(path, os.stat(path).st_mtime_ns)
+
+# Front matter keys are lowercased when parsed; each is offered under its
+# capitalised name, like Title and Content, so "author" fills {{ Author }}.
+def page_slots(meta, title, content):
+    values = {}
+    for key, value in meta.items():
+        if isinstance(value, list):
+            value = ", ".join(value)
+        values[key[:1].upper() + key[1:]] = escape(value)
+    values["Title"] = escape(title)
+    values["Content"] = content
+    return values
+
+def extract_title(node):
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.tag == "h1":
+            return node_text(current).strip()
+        if current.children:
+            stack.extend(reversed(current.children))
+    return None
+
+def node_text(node):
+    parts = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.children:
+            stack.extend(reversed(current.children))
+        elif current.tag == "img":
+            parts.append(current.props["alt"])
+        elif current.value is not None:
+            parts.append(current.value)
+    return "".join(parts)
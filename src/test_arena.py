@@ -0,0 +1,66 @@
+import io
+import unittest
+
+from arena import HTMLArena, markdown_to_arena
+from htmlnode import HTMLNode, LeafNode, ParentNode
+from markdown_helpers import markdown_to_html_node
+
+MARKDOWN = """# A **bold** title
+
+Paragraph with a [link](/a) and ![image](/b.png)
+
+> quoted *text*
+
+- one `code`
+- two
+
+```
+code **stays**
+```
+"""
+
+class TestArena(unittest.TestCase):
+    def test_round_trip_html(self):
+        node = ParentNode("div", [
+            HTMLNode("p", children=[LeafNode(None, "text "), LeafNode("a", "link", {"href": "/x", "class": "y"})]),
+            ParentNode("ul", []),
+            HTMLNode("span", "value"),
+            LeafNode("img", "", {"src": "a.png", "alt": "a"}),
+        ], {"id": "root"})
+        arena = HTMLArena.from_node(node)
+        self.assertEqual(len(arena), 7)
+        self.assertEqual(arena.to_html(), node.to_html())
+        buffer = io.StringIO()
+        arena.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), node.to_html())
+
+    def test_to_node(self):
+        node = ParentNode("div", [HTMLNode("p", children=[LeafNode("b", "x")]), LeafNode(None, "tail")], {"id": "r"})
+        rebuilt = HTMLArena.from_node(node).to_node()
+        self.assertIsInstance(rebuilt, ParentNode)
+        self.assertIsInstance(rebuilt.children[1], LeafNode)
+        self.assertEqual(rebuilt.props, {"id": "r"})
+        self.assertIsNone(rebuilt.children[0].props)
+        self.assertEqual(rebuilt.to_html(), node.to_html())
+
+    def test_leaf_validation(self):
+        with self.assertRaises(ValueError):
+            HTMLArena.from_node(ParentNode("div", [LeafNode("b", None)])).to_html()
+
+    def test_markdown_to_arena(self):
+        arena = markdown_to_arena(MARKDOWN)
+        self.assertEqual(arena.to_html(), markdown_to_html_node(MARKDOWN).to_html())
+        self.assertEqual(arena.to_node().to_html(), markdown_to_html_node(MARKDOWN).to_html())
+        self.assertEqual(markdown_to_arena(MARKDOWN, fused=True).to_html(), arena.to_html())
+
+    def test_deep_nesting(self):
+        node = LeafNode("b", "deep")
+        for _ in range(5000):
+            node = ParentNode("blockquote", [node])
+        arena = HTMLArena.from_node(node)
+        self.assertEqual(arena.to_html(), node.to_html())
+        self.assertEqual(arena.to_node().to_html(), node.to_html())
+
+
+if __name__ == "__main__":
+    unittest.main()
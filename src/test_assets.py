@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+
+from assets import AssetSync, find_assets, zero_copy
+from build import build_site, load_manifest, write_output
+
+class TestAssets(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.static = os.path.join(self.tmp.name, "static")
+        self.output = os.path.join(self.tmp.name, "public")
+        self.manifest = os.path.join(self.tmp.name, "cache", "static-manifest.json")
+        self.write(os.path.join(self.static, "styles.css"), b"body { color: red; }")
+        self.write(os.path.join(self.static, "img", "big.bin"), os.urandom(1 << 16))
+        self.write(os.path.join(self.output, "kept.html"), b"<p>not an asset</p>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def assert_mirrored(self):
+        for asset in find_assets(self.static):
+            self.assertEqual(self.read(os.path.join(self.output, asset)), self.read(os.path.join(self.static, asset)))
+
+    def test_find_assets(self):
+        self.assertEqual(find_assets(self.static), ["styles.css", os.path.join("img", "big.bin")])
+
+    def test_zero_copy(self):
+        source = os.path.join(self.static, "img", "big.bin")
+        dest = os.path.join(self.tmp.name, "copy.bin")
+        zero_copy(source, dest, os.path.getsize(source))
+        self.assertEqual(self.read(dest), self.read(source))
+
+    def test_sync_skips_unchanged_and_removes_stale(self):
+        sync = AssetSync(self.static, self.manifest, zero_copy_threshold=1024)
+        self.assertEqual(sync.sync(self.output), {"styles.css": "added", os.path.join("img", "big.bin"): "added"})
+        self.assert_mirrored()
+        self.assertEqual(sync.sync(self.output), {})
+
+        self.write(os.path.join(self.static, "styles.css"), b"body { color: blue; }")
+        os.remove(os.path.join(self.static, "img", "big.bin"))
+        self.assertEqual(sync.sync(self.output), {"styles.css": "modified", os.path.join("img", "big.bin"): "deleted"})
+        self.assert_mirrored()
+        self.assertFalse(os.path.exists(os.path.join(self.output, "img")))
+        self.assertTrue(os.path.exists(os.path.join(self.output, "kept.html")))
+
+    def test_sync_restores_edited_output(self):
+        sync = AssetSync(self.static, self.manifest)
+        sync.sync(self.output)
+        self.write(os.path.join(self.output, "styles.css"), b"tampered")
+        self.assertEqual(sync.sync(self.output), {"styles.css": "modified"})
+        self.assert_mirrored()
+
+    def test_hardlink(self):
+        AssetSync(self.static, self.manifest, hardlink=True).sync(self.output)
+        self.assert_mirrored()
+        self.assertTrue(os.path.samefile(os.path.join(self.static, "styles.css"), os.path.join(self.output, "styles.css")))
+
+    def test_output_write_replaces_hardlinked_destination(self):
+        AssetSync(self.static, self.manifest, hardlink=True).sync(self.output)
+        self.assertEqual(write_output(os.path.join(self.output, "styles.css"), "rewritten"), "modified")
+        self.assertEqual(self.read(os.path.join(self.static, "styles.css")), b"body { color: red; }")
+        self.assertEqual(self.read(os.path.join(self.output, "styles.css")), b"rewritten")
+
+    def test_page_colliding_with_asset_fails_before_writing(self):
+        content = os.path.join(self.tmp.name, "content")
+        self.write(os.path.join(content, "index.md"), b"# Home")
+        self.write(os.path.join(self.static, "index.html"), b"<p>static home</p>")
+        with self.assertRaises(RuntimeError) as context:
+            build_site(content, self.output, assets=AssetSync(self.static, self.manifest, hardlink=True))
+        self.assertIn("index.html", str(context.exception))
+        self.assertFalse(os.path.exists(os.path.join(self.output, "index.html")))
+        self.assertEqual(self.read(os.path.join(self.static, "index.html")), b"<p>static home</p>")
+
+    def test_build_site_syncs_assets(self):
+        content = os.path.join(self.tmp.name, "content")
+        self.write(os.path.join(content, "index.md"), b"# Home")
+        changes = os.path.join(self.tmp.name, "cache", "changes.json")
+        written = build_site(content, self.output, assets=AssetSync(self.static, self.manifest), changes_path=changes)
+        self.assertEqual(len(written), 3)
+        self.assertEqual(load_manifest(changes)["added"], [os.path.join("img", "big.bin"), "index.html", "styles.css"])
+        self.assert_mirrored()
+
+    def test_asset_replaces_deleted_page(self):
+        content = os.path.join(self.tmp.name, "content")
+        manifest = os.path.join(self.tmp.name, "cache", "manifest.json")
+        changes = os.path.join(self.tmp.name, "cache", "changes.json")
+        self.write(os.path.join(content, "index.md"), b"# Home")
+        self.write(os.path.join(content, "about.md"), b"# About")
+        build_site(content, self.output, manifest_path=manifest, assets=AssetSync(self.static, self.manifest))
+
+        os.remove(os.path.join(content, "about.md"))
+        self.write(os.path.join(self.static, "about.html"), b"<p>static about</p>")
+        written = build_site(content, self.output, manifest_path=manifest, assets=AssetSync(self.static, self.manifest), changes_path=changes)
+        self.assertEqual(written, [os.path.join(self.output, "about.html")])
+        self.assertEqual(self.read(os.path.join(self.output, "about.html")), b"<p>static about</p>")
+        self.assertEqual(load_manifest(changes), {"added": [], "modified": ["about.html"], "deleted": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+
+import block_cache
+from block_cache import BlockCache
+from markdown_helpers import BlockType, markdown_to_html_node
+
+MARKDOWN = """
+# Notice
+
+This page is **licensed** under the [MIT](/license) terms.
+
+- shared
+- list
+"""
+
+class TestBlockCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        cache = BlockCache(max_entries=2)
+        cache.put(BlockType.PARAGRAPH, "a", "<p>a</p>")
+        cache.put(BlockType.PARAGRAPH, "b", "<p>b</p>")
+        self.assertEqual(cache.get(BlockType.PARAGRAPH, "a"), "<p>a</p>")
+        cache.put(BlockType.PARAGRAPH, "c", "<p>c</p>")
+        self.assertIsNone(cache.get(BlockType.PARAGRAPH, "b"))
+        self.assertEqual(cache.get(BlockType.PARAGRAPH, "a"), "<p>a</p>")
+        self.assertEqual(cache.stats(), {"hits": 2, "misses": 1, "entries": 2})
+
+    def test_key_includes_block_type(self):
+        cache = BlockCache()
+        cache.put(BlockType.PARAGRAPH, "a", "<p>a</p>")
+        self.assertIsNone(cache.get(BlockType.HEADING, "a"))
+
+    def test_markdown_to_html_node_with_cache(self):
+        cache = BlockCache()
+        expected = markdown_to_html_node(MARKDOWN).to_html()
+        self.assertEqual(markdown_to_html_node(MARKDOWN, cache).to_html(), expected)
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+        node = markdown_to_html_node(MARKDOWN, cache)
+        self.assertEqual(node.to_html(), expected)
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+        self.assertEqual(node.children[0].tag, "h1")
+
+    def test_disk_cache_shared_between_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blocks.sqlite3")
+            first = BlockCache(path=path)
+            first.put(BlockType.PARAGRAPH, "a", "<p>a</p>")
+            first.close()
+            second = BlockCache(path=path)
+            self.assertEqual(second.get(BlockType.PARAGRAPH, "a"), "<p>a</p>")
+            self.assertEqual(second.hits, 1)
+            second.close()
+
+    def test_disk_cache_keyed_by_renderer_version(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "blocks.sqlite3")
+            first = BlockCache(path=path)
+            first.put(BlockType.PARAGRAPH, "a", "<p>stale</p>")
+            first.close()
+            version = block_cache.CACHE_VERSION
+            block_cache.CACHE_VERSION = "changed"
+            try:
+                second = BlockCache(path=path)
+                self.assertIsNone(second.get(BlockType.PARAGRAPH, "a"))
+                second.close()
+            finally:
+                block_cache.CACHE_VERSION = version
+
+    def test_disk_cache_prune(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = BlockCache(path=os.path.join(tmp, "blocks.sqlite3"), max_disk_entries=2)
+            for text in ["a", "b", "c"]:
+                cache.put(BlockType.PARAGRAPH, text, f"<p>{text}</p>")
+            cache.entries.clear()
+            cache.get(BlockType.PARAGRAPH, "a")
+            cache.entries.clear()
+            cache.prune()
+            self.assertIsNone(cache.get(BlockType.PARAGRAPH, "b"))
+            self.assertEqual(cache.get(BlockType.PARAGRAPH, "a"), "<p>a</p>")
+            cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
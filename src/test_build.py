@@ -0,0 +1,239 @@
+import os
+import tempfile
+import unittest
+
+import build
+from build import build_site, find_pages, load_manifest, merge_changes, page_output_path
+from links import LinkGraph
+from template import Template
+
+PAGES = {
+    "index.md": "# Home\n\nWelcome to the **site**.",
+    "blog/first.md": "# First\n\n- one\n- two",
+    "blog/second.md": "> a quote\n\n```\ncode\n```",
+    "docs/guide/setup.md": "1. install\n2. run [it](/run)",
+    "notes.txt": "not markdown",
+}
+
+def read_tree(root):
+    tree = {}
+    for dirpath, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(dirpath, name)
+            with open(path, encoding="utf-8") as f:
+                tree[os.path.relpath(path, root)] = f.read()
+    return tree
+
+class TestBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        for page, markdown in PAGES.items():
+            path = os.path.join(self.content, page)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(markdown)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_find_pages_sorted(self):
+        self.assertEqual(
+            find_pages(self.content),
+            ["index.md", os.path.join("blog", "first.md"), os.path.join("blog", "second.md"), os.path.join("docs", "guide", "setup.md")],
+        )
+
+    def test_page_output_path(self):
+        self.assertEqual(page_output_path(os.path.join("blog", "first.md")), os.path.join("blog", "first.html"))
+
+    def test_build_site_writes_html(self):
+        output = os.path.join(self.tmp.name, "public")
+        build_site(self.content, output)
+        tree = read_tree(output)
+        self.assertEqual(tree["index.html"], "<div><h1>Home</h1><p>Welcome to the <b>site</b>.</p></div>")
+        self.assertEqual(len(tree), 4)
+
+    def test_build_site_deterministic_across_jobs(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        parallel = os.path.join(self.tmp.name, "parallel")
+        build_site(self.content, serial, jobs=1)
+        build_site(self.content, parallel, jobs=3)
+        self.assertEqual(read_tree(serial), read_tree(parallel))
+
+    def test_build_with_shared_block_cache_matches(self):
+        plain = os.path.join(self.tmp.name, "plain")
+        cached = os.path.join(self.tmp.name, "cached")
+        cache_options = {"max_entries": 16, "path": os.path.join(self.tmp.name, "blocks.sqlite3")}
+        build_site(self.content, plain)
+        build_site(self.content, cached, jobs=2, cache_options=cache_options)
+        self.assertEqual(read_tree(plain), read_tree(cached))
+
+    def test_build_site_with_template(self):
+        output = os.path.join(self.tmp.name, "public")
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        build_site(self.content, output, jobs=2, template=template)
+        tree = read_tree(output)
+        self.assertEqual(tree["index.html"], "<title>Home</title><body><div><h1>Home</h1><p>Welcome to the <b>site</b>.</p></div></body>")
+        self.assertTrue(tree[os.path.join("blog", "second.html")].startswith("<title>second</title>"))
+
+    def test_template_change_rebuilds_all_pages(self):
+        output = os.path.join(self.tmp.name, "public")
+        manifest = os.path.join(self.tmp.name, "cache", "manifest.json")
+        build_site(self.content, output, manifest_path=manifest, template=Template("{{ Content }}"))
+        self.assertEqual(build_site(self.content, output, manifest_path=manifest, template=Template("{{ Content }}")), [])
+        self.assertEqual(len(build_site(self.content, output, manifest_path=manifest, template=Template("<main>{{ Content }}</main>"))), 4)
+
+    def test_build_with_parse_cache_matches(self):
+        plain = os.path.join(self.tmp.name, "plain")
+        cached = os.path.join(self.tmp.name, "cached")
+        parse_cache_dir = os.path.join(self.tmp.name, "parsed")
+        build_site(self.content, plain)
+        build_site(self.content, cached, jobs=2, parse_cache_dir=parse_cache_dir)
+        self.assertEqual(read_tree(plain), read_tree(cached))
+        build_site(self.content, cached, template=Template("<main>{{ Content }}</main>"), parse_cache_dir=parse_cache_dir)
+        self.assertEqual(read_tree(cached)["index.html"], "<main>" + read_tree(plain)["index.html"] + "</main>")
+
+    def test_template_pages_do_not_reread_front_matter(self):
+        with open(os.path.join(self.content, "titled.md"), "w", encoding="utf-8") as f:
+            f.write("---\ntitle: From meta\n---\n# Heading\n")
+        output = os.path.join(self.tmp.name, "public")
+        template = Template("<title>{{ Title }}</title>")
+        def reread(path):
+            raise AssertionError(f"front matter of {path} read twice")
+        load_front_matter = build.load_front_matter
+        build.load_front_matter = reread
+        try:
+            build_site(self.content, output, template=template)
+            build_site(self.content, os.path.join(self.tmp.name, "streamed"), template=template, stream_threshold=0)
+        finally:
+            build.load_front_matter = load_front_matter
+        self.assertEqual(read_tree(output)["titled.html"], "<title>From meta</title>")
+
+    def test_front_matter_fills_custom_slots(self):
+        with open(os.path.join(self.content, "post.md"), "w", encoding="utf-8") as f:
+            f.write("---\nauthor: Ann\ncontent: spoof\n---\n# Post\n")
+        template = Template("<p>by {{ Author }}</p>{{ Content }}")
+        for name, options in [("plain", {}), ("streamed", {"stream_threshold": 0}), ("sharded", {"jobs": 2, "parallel_threshold": 0})]:
+            output = os.path.join(self.tmp.name, name)
+            build_site(self.content, output, template=template, **options)
+            self.assertEqual(read_tree(output)["post.html"], "<p>by Ann</p><div><h1>Post</h1></div>")
+
+    def test_heading_title_is_escaped(self):
+        with open(os.path.join(self.content, "cats.md"), "w", encoding="utf-8") as f:
+            f.write("# Cats & <dogs>\n")
+        output = os.path.join(self.tmp.name, "public")
+        build_site(self.content, output, template=Template("<title>{{ Title }}</title>"))
+        self.assertEqual(read_tree(output)["cats.html"], "<title>Cats &amp; &lt;dogs&gt;</title>")
+
+    def test_streamed_pages_match(self):
+        plain = os.path.join(self.tmp.name, "plain")
+        streamed = os.path.join(self.tmp.name, "streamed")
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        build_site(self.content, plain, template=template)
+        build_site(self.content, streamed, template=template, stream_threshold=0)
+        self.assertEqual(read_tree(plain), read_tree(streamed))
+
+    def test_parallel_block_pages_match(self):
+        plain = os.path.join(self.tmp.name, "plain")
+        sharded = os.path.join(self.tmp.name, "sharded")
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        build_site(self.content, plain, template=template)
+        build_site(self.content, sharded, jobs=2, template=template, parallel_threshold=0)
+        self.assertEqual(read_tree(plain), read_tree(sharded))
+
+    def test_incremental_build_only_rebuilds_changed_pages(self):
+        output = os.path.join(self.tmp.name, "public")
+        manifest = os.path.join(self.tmp.name, "cache", "manifest.json")
+        self.assertEqual(len(build_site(self.content, output, manifest_path=manifest)), 4)
+        self.assertEqual(build_site(self.content, output, manifest_path=manifest), [])
+
+        with open(os.path.join(self.content, "index.md"), "w", encoding="utf-8") as f:
+            f.write("# Home\n\nEdited.")
+        self.assertEqual(build_site(self.content, output, manifest_path=manifest), [os.path.join(output, "index.html")])
+        self.assertEqual(read_tree(output)["index.html"], "<div><h1>Home</h1><p>Edited.</p></div>")
+
+    def test_incremental_build_removes_deleted_pages(self):
+        output = os.path.join(self.tmp.name, "public")
+        manifest = os.path.join(self.tmp.name, "cache", "manifest.json")
+        build_site(self.content, output, manifest_path=manifest)
+        os.remove(os.path.join(self.content, "docs", "guide", "setup.md"))
+        self.assertEqual(build_site(self.content, output, manifest_path=manifest), [])
+        self.assertNotIn(os.path.join("docs", "guide", "setup.html"), read_tree(output))
+        self.assertFalse(os.path.exists(os.path.join(output, "docs")))
+
+    def test_incremental_build_restores_missing_output(self):
+        output = os.path.join(self.tmp.name, "public")
+        manifest = os.path.join(self.tmp.name, "cache", "manifest.json")
+        build_site(self.content, output, manifest_path=manifest)
+        os.remove(os.path.join(output, "index.html"))
+        self.assertEqual(build_site(self.content, output, manifest_path=manifest), [os.path.join(output, "index.html")])
+
+    def test_identical_outputs_are_not_rewritten(self):
+        output = os.path.join(self.tmp.name, "public")
+        build_site(self.content, output)
+        index = os.path.join(output, "index.html")
+        os.utime(index, ns=(0, 0))
+        self.assertEqual(build_site(self.content, output), [])
+        self.assertEqual(os.stat(index).st_mtime_ns, 0)
+
+    def test_changes_manifest(self):
+        output = os.path.join(self.tmp.name, "public")
+        manifest = os.path.join(self.tmp.name, "cache", "manifest.json")
+        changes = os.path.join(self.tmp.name, "cache", "changes.json")
+        build_site(self.content, output, manifest_path=manifest, changes_path=changes)
+        self.assertEqual(len(load_manifest(changes)["added"]), 4)
+
+        with open(os.path.join(self.content, "index.md"), "w", encoding="utf-8") as f:
+            f.write("# Home\n\nEdited.")
+        os.remove(os.path.join(self.content, "docs", "guide", "setup.md"))
+        build_site(self.content, output, manifest_path=manifest, changes_path=changes)
+        self.assertEqual(load_manifest(changes), {
+            "added": [],
+            "modified": ["index.html"],
+            "deleted": [os.path.join("docs", "guide", "setup.html")],
+        })
+
+    def test_merge_changes(self):
+        changes = os.path.join(self.tmp.name, "cache", "changes.json")
+        build_site(self.content, os.path.join(self.tmp.name, "public"), changes_path=changes)
+        merge_changes(changes, {"index.html.gz": "added", "styles.css.gz": "unchanged", "old.html.gz": "deleted"})
+        self.assertEqual(load_manifest(changes)["deleted"], ["old.html.gz"])
+        self.assertIn("index.html.gz", load_manifest(changes)["added"])
+        self.assertNotIn("styles.css.gz", load_manifest(changes)["added"])
+
+    def test_link_graph_is_recorded_while_parsing(self):
+        output = os.path.join(self.tmp.name, "public")
+        manifest = os.path.join(self.tmp.name, "cache", "manifest.json")
+        with open(os.path.join(self.content, "index.md"), "w", encoding="utf-8") as f:
+            f.write("# Home\n\nRead the [guide](docs/guide/setup.html) and ![logo](/logo.png).")
+        build_site(self.content, output, manifest_path=manifest, cache_options={"max_entries": 16})
+
+        graph = LinkGraph()
+        self.assertEqual(len(build_site(self.content, output, jobs=2, manifest_path=manifest, link_graph=graph)), 0)
+        self.assertEqual(graph.pages["index.html"], [("link", "docs/guide/setup.html", "guide"), ("image", "/logo.png", "logo")])
+        self.assertEqual(graph.pages["docs/guide/setup.html"], [("link", "/run", "it")])
+        self.assertEqual(graph.pages["blog/first.html"], [])
+
+        os.remove(os.path.join(self.content, "docs", "guide", "setup.md"))
+        build_site(self.content, output, manifest_path=manifest, link_graph=graph)
+        self.assertNotIn("docs/guide/setup.html", graph)
+        self.assertEqual(graph.pages["index.html"][0], ("link", "docs/guide/setup.html", "guide"))
+
+    def test_link_graph_of_streamed_page_with_template(self):
+        with open(os.path.join(self.content, "index.md"), "w", encoding="utf-8") as f:
+            f.write("# [home](/x.html)\n\nSee [docs](/docs.html).")
+        graph = LinkGraph()
+        build_site(self.content, os.path.join(self.tmp.name, "public"), template=Template("<title>{{ Title }}</title>{{ Content }}"), stream_threshold=0, link_graph=graph)
+        self.assertEqual(graph.pages["index.html"], [("link", "/x.html", "home"), ("link", "/docs.html", "docs")])
+
+    def test_link_graph_with_parse_cache(self):
+        parse_cache_dir = os.path.join(self.tmp.name, "parsed")
+        first, second = LinkGraph(), LinkGraph()
+        build_site(self.content, os.path.join(self.tmp.name, "a"), parse_cache_dir=parse_cache_dir, link_graph=first)
+        build_site(self.content, os.path.join(self.tmp.name, "b"), parse_cache_dir=parse_cache_dir, link_graph=second)
+        self.assertEqual(first.pages, second.pages)
+        self.assertEqual(second.pages["docs/guide/setup.html"], [("link", "/run", "it")])
+
+
+if __name__ == "__main__":
+    unittest.main()
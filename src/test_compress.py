@@ -0,0 +1,75 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from compress import compress_outputs, find_compressible, gzip_bytes
+
+class TestCompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp.name, "public")
+        self.manifest = os.path.join(self.tmp.name, "gzip-manifest.json")
+        self.files = {
+            "index.html": "<p>" + "hello world " * 200 + "</p>",
+            "styles.css": "body { color: red; }\n" * 100,
+            os.path.join("blog", "post.html"): "<div>" + "post " * 300 + "</div>",
+            "tiny.txt": "x",
+            "image.png": "not text",
+        }
+        for name, text in self.files.items():
+            self.write(name, text)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.output, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def read_gz(self, name):
+        with gzip.open(os.path.join(self.output, name + ".gz"), "rt", encoding="utf-8") as f:
+            return f.read()
+
+    def test_gzip_bytes_round_trip(self):
+        self.assertEqual(gzip.decompress(gzip_bytes(b"abc" * 100)), b"abc" * 100)
+
+    def test_find_compressible(self):
+        self.assertEqual(find_compressible(self.output), ["index.html", "styles.css", "tiny.txt", os.path.join("blog", "post.html")])
+
+    def test_compress_outputs(self):
+        summary = compress_outputs(self.output, jobs=2, manifest_path=self.manifest)
+        self.assertEqual(summary["compressed"], 4)
+        self.assertEqual(self.read_gz("index.html"), self.files["index.html"])
+        self.assertEqual(self.read_gz(os.path.join("blog", "post.html")), self.files[os.path.join("blog", "post.html")])
+        self.assertFalse(os.path.exists(os.path.join(self.output, "tiny.txt.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.output, "image.png.gz")))
+        self.assertGreater(summary["saved_bytes"], 0)
+
+    def test_unchanged_files_are_skipped(self):
+        first = compress_outputs(self.output, manifest_path=self.manifest)
+        second = compress_outputs(self.output, manifest_path=self.manifest)
+        self.assertEqual(second["compressed"], 0)
+        self.assertEqual(second["skipped"], 4)
+        self.assertEqual(second["saved_bytes"], first["saved_bytes"])
+        self.write("index.html", "<p>" + "changed " * 200 + "</p>")
+        third = compress_outputs(self.output, manifest_path=self.manifest)
+        self.assertEqual(third["compressed"], 1)
+        self.assertEqual(third["statuses"], {"index.html.gz": "modified"})
+        self.assertEqual(self.read_gz("index.html"), "<p>" + "changed " * 200 + "</p>")
+
+    def test_missing_gz_is_recreated_and_stale_gz_removed(self):
+        compress_outputs(self.output, manifest_path=self.manifest)
+        os.remove(os.path.join(self.output, "styles.css.gz"))
+        os.remove(os.path.join(self.output, "index.html"))
+        summary = compress_outputs(self.output, manifest_path=self.manifest)
+        self.assertEqual(summary["compressed"], 1)
+        self.assertEqual(summary["statuses"], {"index.html.gz": "deleted", "styles.css.gz": "added"})
+        self.assertTrue(os.path.exists(os.path.join(self.output, "styles.css.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.output, "index.html.gz")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+from client import request
+from daemon import BuildDaemon, make_daemon_server
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.output = os.path.join(self.tmp.name, "public")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        self.socket_path = os.path.join(self.tmp.name, "daemon.sock")
+        os.makedirs(self.content)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome.")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        build_options = {"cache_options": {"max_entries": 16}, "manifest_path": os.path.join(self.tmp.name, "manifest.json")}
+        self.server = make_daemon_server(self.socket_path, BuildDaemon(self.content, self.output, build_options, self.template))
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_ping(self):
+        self.assertEqual(request(self.socket_path, {"command": "ping"}), {"ok": True, "pid": os.getpid()})
+
+    def test_build(self):
+        response = request(self.socket_path, {"command": "build"})
+        self.assertEqual(response["written"], [os.path.join(self.output, "index.html")])
+        with open(os.path.join(self.output, "index.html"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<title>Home</title><div><h1>Home</h1><p>Welcome.</p></div>")
+        self.assertEqual(request(self.socket_path, {"command": "build"})["written"], [])
+
+    def test_render_path_and_inline_markdown(self):
+        path = os.path.join(self.content, "index.md")
+        self.assertEqual(request(self.socket_path, {"command": "render", "path": path})["html"], "<title>Home</title><div><h1>Home</h1><p>Welcome.</p></div>")
+        response = request(self.socket_path, {"command": "render", "markdown": "---\ntitle: Draft\n---\n**bold**"})
+        self.assertEqual(response["html"], "<title>Draft</title><div><p><b>bold</b></p></div>")
+        self.write(self.template, "<p>by {{ Author }}</p>{{ Content }}")
+        response = request(self.socket_path, {"command": "render", "markdown": "---\nauthor: Ann\n---\ntext"})
+        self.assertEqual(response["html"], "<p>by Ann</p><div><p>text</p></div>")
+        response = request(self.socket_path, {"command": "render", "markdown": "text", "template": False})
+        self.assertEqual(response["html"], "<div><p>text</p></div>")
+        self.assertFalse(os.path.exists(self.output))
+
+    def test_render_relative_path_from_another_directory(self):
+        client = os.path.join(os.path.dirname(os.path.abspath(__file__)), "client.py")
+        result = subprocess.run(
+            [sys.executable, client, "--socket", self.socket_path, "render", "index.md", "--bare"],
+            cwd=self.content, capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout, "<div><h1>Home</h1><p>Welcome.</p></div>")
+        response = request(self.socket_path, {"command": "render", "path": "index.md"})
+        self.assertFalse(response["ok"])
+        self.assertIn("absolute path", response["error"])
+
+    def test_errors(self):
+        self.assertFalse(request(self.socket_path, {"command": "nope"})["ok"])
+        response = request(self.socket_path, {"command": "render", "path": os.path.join(self.tmp.name, "missing.md")})
+        self.assertFalse(response["ok"])
+        self.assertIn("FileNotFoundError", response["error"])
+        self.assertTrue(request(self.socket_path, {"command": "ping"})["ok"])
+
+    def test_refuses_second_daemon(self):
+        with self.assertRaises(RuntimeError):
+            make_daemon_server(self.socket_path, None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import io
+import unittest
+
+from front_matter import parse_front_matter, read_front_matter, split_front_matter
+
+MARKDOWN = "---\ntitle: Hello: world\ndate: 2024-05-01\ntags: [python, \"static sites\"]\ndraft: 'false'\n---\n# Body\n\ntext"
+
+class TestFrontMatter(unittest.TestCase):
+    def test_parse_front_matter(self):
+        self.assertEqual(parse_front_matter(["Title: Hi", "# comment", "", "tags: [a, b]"]), {"title": "Hi", "tags": ["a", "b"]})
+
+    def test_split_front_matter(self):
+        meta, body = split_front_matter(MARKDOWN)
+        self.assertEqual(meta, {"title": "Hello: world", "date": "2024-05-01", "tags": ["python", "static sites"], "draft": "false"})
+        self.assertEqual(body, "# Body\n\ntext")
+
+    def test_split_without_front_matter(self):
+        self.assertEqual(split_front_matter("# Body"), ({}, "# Body"))
+        self.assertEqual(split_front_matter("---\nnot closed"), ({}, "---\nnot closed"))
+
+    def test_read_front_matter_stops_at_header(self):
+        f = io.StringIO(MARKDOWN)
+        self.assertEqual(read_front_matter(f)["title"], "Hello: world")
+        self.assertEqual(f.read(), "# Body\n\ntext")
+
+    def test_read_without_front_matter_rewinds(self):
+        for text in ("# Body\n\ntext", "---\nnot closed\n"):
+            f = io.StringIO(text)
+            self.assertEqual(read_front_matter(f), {})
+            self.assertEqual(f.read(), text)
+
+    def test_read_matches_split(self):
+        self.assertEqual(read_front_matter(io.StringIO(MARKDOWN)), split_front_matter(MARKDOWN)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
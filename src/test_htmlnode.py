@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode, text_node_to_html_node
+from htmlnode import HTMLNode, LeafNode, ParentNode, text_node_to_html_node, text_nodes_to_html
 from textnode import TextNode, TextType
 
 class TestHTMLNode(unittest.TestCase):
@@ -62,6 +63,31 @@ class TestHTMLNode(unittest.TestCase):
         expected = '<div class="my-class" id="abc"><p>Hello</p></div>'
         self.assertEqual(result, expected, "The HTML output didn't match the spellbook's prophecy!")
 
+    def test_iter_html_chunks(self):
+        node = ParentNode("div", [LeafNode("b", "bold"), LeafNode(None, " text")])
+        self.assertEqual(list(node.iter_html()), ["<div>", "<b>bold</b>", " text", "</div>"])
+
+    def test_write_html_matches_to_html(self):
+        node = HTMLNode("div", children=[ParentNode("p", [LeafNode("a", "link", {"href": "x.html"})])])
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), node.to_html())
+        self.assertEqual(buffer.getvalue(), '<div><p><a href="x.html">link</a></p></div>')
+
+    def test_deeply_nested_to_html(self):
+        depth = 10000
+        node = LeafNode("b", "deep")
+        for _ in range(depth):
+            node = ParentNode("blockquote", [node])
+        html = node.to_html()
+        self.assertEqual(html, "<blockquote>" * depth + "<b>deep</b>" + "</blockquote>" * depth)
+
+    def test_nodes_are_slotted(self):
+        node = ParentNode("div", [LeafNode("b", "bold")])
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertFalse(hasattr(node.children[0], "__dict__"))
+        self.assertIs(HTMLNode("".join(["h", "2"])).tag, "h2")
+
     def test_text(self):
         node = TextNode("This is a text node", TextType.TEXT)
         html_node = text_node_to_html_node(node)
@@ -103,6 +129,24 @@ class TestHTMLNode(unittest.TestCase):
         self.assertEqual(html_node.value, "")
         self.assertEqual(html_node.props,{"src": "img.jpg", "alt": "Image description"})
 
+    def test_text_nodes_to_html_matches_leaf_nodes(self):
+        nodes = [
+            TextNode("plain ", TextType.TEXT),
+            TextNode("bold", TextType.BOLD),
+            TextNode("italic", TextType.ITALIC),
+            TextNode("code", TextType.CODE),
+            TextNode("link", TextType.LINK, "/a"),
+            TextNode("alt", TextType.IMAGE, "/b.png"),
+        ]
+        expected = "".join(text_node_to_html_node(node).to_html() for node in nodes)
+        self.assertEqual(text_nodes_to_html(nodes), expected)
+
+    def test_text_nodes_to_html_invalid(self):
+        with self.assertRaises(ValueError):
+            text_nodes_to_html([TextNode("Invalid link", TextType.LINK)])
+        with self.assertRaises(ValueError):
+            text_nodes_to_html([TextNode("", TextType.IMAGE, url="img.jpg")])
+
     def test_link_no_url(self):
         node = TextNode("Invalid link",TextType.LINK)
         with self.assertRaises(ValueError):
@@ -0,0 +1,111 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from build import build_site, load_manifest
+from image_size import ImageSizes, probe_image
+
+def png(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00" + b"\x00" * 64
+
+def gif(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\x00" * 64
+
+def jpeg(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, height, width) + b"\x00" * 10
+    return b"\xff\xd8" + app0 + sof + b"\x00" * 64
+
+def webp(chunk, payload):
+    return b"RIFF" + struct.pack("<I", 4 + 8 + len(payload)) + b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload + b"\x00" * 64
+
+class TestProbeImage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def probe(self, data):
+        path = os.path.join(self.tmp.name, "image")
+        with open(path, "wb") as f:
+            f.write(data)
+        return probe_image(path)
+
+    def test_formats(self):
+        self.assertEqual(self.probe(png(640, 480)), (640, 480))
+        self.assertEqual(self.probe(gif(32, 16)), (32, 16))
+        self.assertEqual(self.probe(jpeg(1024, 768)), (1024, 768))
+        self.assertEqual(self.probe(webp(b"VP8X", b"\x00" * 4 + (799).to_bytes(3, "little") + (599).to_bytes(3, "little"))), (800, 600))
+        self.assertEqual(self.probe(webp(b"VP8L", b"\x2f" + (99 | 49 << 14).to_bytes(4, "little"))), (100, 50))
+        self.assertEqual(self.probe(webp(b"VP8 ", b"\x00\x00\x00\x9d\x01\x2a" + struct.pack("<HH", 300, 200))), (300, 200))
+
+    def test_unknown_or_truncated(self):
+        self.assertIsNone(self.probe(b"not an image"))
+        self.assertIsNone(self.probe(b""))
+        self.assertIsNone(self.probe(jpeg(10, 10)[:25]))
+
+class TestImageSizes(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.output = os.path.join(self.tmp.name, "public")
+        self.static = os.path.join(self.tmp.name, "static")
+        self.cache = os.path.join(self.tmp.name, "cache", "image-sizes.json")
+        self.write(os.path.join(self.static, "img", "logo.png"), png(120, 60))
+        self.write(os.path.join(self.content, "index.md"), b"# Home\n\n![logo](/img/logo.png) ![remote](https://example.com/a.png)")
+        self.write(os.path.join(self.content, "blog", "post.md"), b"![logo](../img/logo.png)\n\n![missing](missing.png)")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def read(self, *parts):
+        with open(os.path.join(self.output, *parts), encoding="utf-8") as f:
+            return f.read()
+
+    def test_props(self):
+        sizes = ImageSizes([self.output, self.static])
+        self.assertEqual(sizes.props("blog/post.html", "../img/logo.png"), {"width": "120", "height": "60"})
+        self.assertIsNone(sizes.props("index.html", "https://example.com/a.png"))
+        self.assertIsNone(sizes.props("index.html", "missing.png"))
+
+    def test_cached_by_mtime(self):
+        first = ImageSizes([self.static], self.cache)
+        first.props("index.html", "/img/logo.png")
+        self.assertEqual(len(first.take_probed()), 1)
+        first.save()
+        second = ImageSizes([self.static], self.cache)
+        self.assertEqual(second.props("index.html", "/img/logo.png"), {"width": "120", "height": "60"})
+        self.assertEqual(second.take_probed(), {})
+        self.write(os.path.join(self.static, "img", "logo.png"), png(240, 120))
+        os.utime(os.path.join(self.static, "img", "logo.png"), ns=(1, 1))
+        self.assertEqual(second.props("index.html", "/img/logo.png"), {"width": "240", "height": "120"})
+
+    def test_build_adds_dimensions(self):
+        manifest = os.path.join(self.tmp.name, "cache", "manifest.json")
+        for jobs in (1, 2):
+            sizes = ImageSizes([self.output, self.static], self.cache)
+            build_site(self.content, self.output, jobs, manifest_path=manifest, cache_options={"max_entries": 16}, image_sizes=sizes)
+            self.assertEqual(
+                self.read("index.html"),
+                '<div><h1>Home</h1><p><img src="/img/logo.png" alt="logo" width="120" height="60"></img><img src="https://example.com/a.png" alt="remote"></img></p></div>',
+            )
+            self.assertEqual(self.read("blog", "post.html"), '<div><p><img src="../img/logo.png" alt="logo" width="120" height="60"></img></p><p><img src="missing.png" alt="missing"></img></p></div>')
+        self.assertIn(os.path.join(self.static, "img", "logo.png"), load_manifest(self.cache))
+
+        self.assertEqual(build_site(self.content, self.output, manifest_path=manifest, image_sizes=ImageSizes([self.output, self.static], self.cache)), [])
+        self.write(os.path.join(self.static, "img", "logo.png"), png(60, 30))
+        os.utime(os.path.join(self.static, "img", "logo.png"), ns=(1, 1))
+        written = build_site(self.content, self.output, manifest_path=manifest, image_sizes=ImageSizes([self.output, self.static], self.cache))
+        self.assertEqual(len(written), 2)
+        self.assertIn('width="60" height="30"', self.read("index.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
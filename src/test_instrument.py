@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+
+import instrument
+import markdown_helpers
+from build import build_site
+from instrument import BuildReport
+
+MARKDOWN = "# Title\n\nSome **bold** [link](/x)\n\n- one\n- two"
+HTML = "<div><h1>Title</h1><p>Some <b>bold</b> <a href=\"/x\">link</a></p><ul><li>one</li><li>two</li></ul></div>"
+
+class TestInstrument(unittest.TestCase):
+    def tearDown(self):
+        instrument.disable()
+
+    def test_enable_records_stages(self):
+        recorder = instrument.enable()
+        self.assertEqual(markdown_helpers.markdown_to_html_node(MARKDOWN).to_html(), HTML)
+        stages, calls = recorder.take()
+        self.assertEqual(set(stages), {"markdown_to_blocks", "block_to_block_type", "text_to_children"})
+        self.assertEqual(calls["block_to_block_type"], 3)
+        self.assertEqual(calls["text_to_children"], 4)
+        self.assertTrue(all(seconds >= 0 for seconds in stages.values()))
+
+    def test_disable_restores_functions(self):
+        original = markdown_helpers.text_to_children
+        instrument.enable()
+        self.assertIsNot(markdown_helpers.text_to_children, original)
+        instrument.disable()
+        self.assertIs(markdown_helpers.text_to_children, original)
+        self.assertIsNone(instrument.recorder)
+
+    def test_report_keeps_slowest_pages(self):
+        report = BuildReport(top=2)
+        for page, seconds in [("a", 0.3), ("b", 0.1), ("c", 0.5)]:
+            report.add({"page": page, "seconds": seconds, "stages": {"to_html": seconds}, "calls": {"to_html": 1}, "nodes": 2, "output_bytes": 10})
+        data = report.to_dict()
+        self.assertEqual([stats["page"] for stats in data["slowest_pages"]], ["c", "a"])
+        self.assertEqual(data["pages"], 3)
+        self.assertEqual(data["nodes"], 6)
+        self.assertEqual(data["stages"]["to_html"]["calls"], 3)
+
+    def test_build_site_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(content)
+            for name in ["a.md", "b.md", "c.md"]:
+                with open(os.path.join(content, name), "w", encoding="utf-8") as f:
+                    f.write(MARKDOWN)
+            report = BuildReport(top=2)
+            build_site(content, os.path.join(tmp, "public"), jobs=2, report=report)
+            data = report.to_dict()
+        self.assertEqual(data["pages"], 3)
+        self.assertEqual(len(data["slowest_pages"]), 2)
+        self.assertEqual(data["output_bytes"], 3 * len(HTML))
+        for stage in ["read", "markdown_to_html_node", "to_html", "write", "markdown_to_blocks", "block_to_block_type", "text_to_children"]:
+            self.assertIn(stage, data["stages"])
+        self.assertIsNone(instrument.recorder)
+
+    def test_report_counts_cache_hits(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            os.makedirs(content)
+            for name in ["a.md", "b.md"]:
+                with open(os.path.join(content, name), "w", encoding="utf-8") as f:
+                    f.write(MARKDOWN)
+            report = BuildReport()
+            build_site(content, os.path.join(tmp, "public"), cache_options={"max_entries": 64}, report=report)
+            data = report.to_dict()
+        self.assertEqual(data["cache"], {"block_hits": 2, "block_misses": 2})
+        self.assertEqual(data["stages"]["text_to_children"]["calls"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
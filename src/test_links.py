@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+import unittest
+
+from links import LinkGraph, find_outputs, page_links, resolve_url
+from textnode import text_to_textnodes
+
+class TestLinks(unittest.TestCase):
+    def test_page_links(self):
+        text_nodes = text_to_textnodes("See [docs](/docs/) and ![logo](img/logo.png) or **bold**")
+        self.assertEqual(page_links(text_nodes), [("link", "/docs/", "docs"), ("image", "img/logo.png", "logo")])
+
+    def test_resolve_url(self):
+        self.assertIsNone(resolve_url("index.html", "https://example.com/a"))
+        self.assertIsNone(resolve_url("index.html", "mailto:me@example.com"))
+        self.assertIsNone(resolve_url("index.html", "#top"))
+        self.assertEqual(resolve_url("blog/first.html", "/docs/"), "docs/index.html")
+        self.assertEqual(resolve_url("blog/first.html", "second.html#intro"), "blog/second.html")
+        self.assertEqual(resolve_url("blog/first.html", "../img/a%20b.png"), "img/a b.png")
+        self.assertEqual(resolve_url("index.html", "../outside.html"), "..")
+
+    def test_check(self):
+        graph = LinkGraph()
+        graph.add("index.html", [("link", "/blog/first", "first"), ("link", "https://example.com", "out"), ("image", "missing.png", "gone")])
+        graph.add(os.path.join("blog", "first.html"), [("link", "../", "home"), ("link", "second.html", "next")])
+        outputs = {"index.html", "blog/first.html"}
+        self.assertEqual(graph.check(outputs), [
+            {"page": "blog/first.html", "kind": "link", "url": "second.html", "text": "next"},
+            {"page": "index.html", "kind": "image", "url": "missing.png", "text": "gone"},
+        ])
+
+    def test_round_trip(self):
+        graph = LinkGraph()
+        graph.add("index.html", [("link", "/a", "a")])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "graph.json")
+            graph.write(path)
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(json.load(f), {"index.html": [{"kind": "link", "url": "/a", "text": "a"}]})
+            self.assertEqual(LinkGraph.load(path).pages, graph.pages)
+
+    def test_find_outputs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "blog"))
+            for name in ("index.html", os.path.join("blog", "first.html")):
+                open(os.path.join(tmp, name), "w").close()
+            self.assertEqual(find_outputs(tmp), {"index.html", "blog/first.html"})
+
+
+if __name__ == "__main__":
+    unittest.main()
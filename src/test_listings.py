@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+
+from build import build_site, load_manifest
+from listings import MetadataIndex, page_url, slugify
+from template import Template
+
+PAGES = {
+    "index.md": "# Home\n\nWelcome.",
+    "blog/first.md": "---\ntitle: First & best\ndate: 2024-01-01\ntags: [python]\n---\n# Ignored\n\nOne.",
+    "blog/second.md": "---\ntitle: Second\ndate: 2024-02-01\ntags: [python, Static Sites]\ndescription: The second post\n---\nTwo.",
+    "blog/third.md": "---\ndate: 2024-03-01\n---\nThree.",
+    "blog/draft.md": "---\ntitle: Draft\ndate: 2024-04-01\ndraft: true\n---\nDraft.",
+}
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+class TestListings(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.output = os.path.join(self.tmp.name, "public")
+        self.index_path = os.path.join(self.tmp.name, "cache", "metadata.json")
+        for page, markdown in PAGES.items():
+            self.write_page(page, markdown)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_page(self, page, markdown):
+        path = os.path.join(self.content, page)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(markdown)
+
+    def build(self, **kwargs):
+        metadata_index = MetadataIndex(self.index_path, "https://example.com/", page_size=2)
+        return build_site(self.content, self.output, metadata_index=metadata_index, **kwargs)
+
+    def test_helpers(self):
+        self.assertEqual(slugify("Static Sites!"), "static-sites")
+        self.assertEqual(page_url("index.html"), "/")
+        self.assertEqual(page_url("posts/page/2/index.html"), "/posts/page/2/")
+        self.assertEqual(page_url("blog/first.html"), "/blog/first.html")
+
+    def test_front_matter_is_not_rendered(self):
+        self.build(template=Template("<title>{{ Title }}</title>{{ Content }}"))
+        self.assertEqual(read(os.path.join(self.output, "blog", "first.html")), "<title>First &amp; best</title><div><h1>Ignored</h1><p>One.</p></div>")
+        self.assertEqual(read(os.path.join(self.output, "blog", "third.html")), "<title>third</title><div><p>Three.</p></div>")
+
+    def test_front_matter_reaches_page_template(self):
+        self.build(template=Template("<meta content=\"{{ Description }}\">{{ Tags }}"))
+        self.assertEqual(read(os.path.join(self.output, "blog", "second.html")), '<meta content="The second post">python, Static Sites')
+
+    def test_listing_colliding_with_page_fails_before_writing(self):
+        self.write_page("posts/index.md", "# Mine")
+        with self.assertRaises(RuntimeError) as context:
+            self.build()
+        self.assertIn("posts/index.html", str(context.exception))
+        self.assertFalse(os.path.exists(self.output))
+
+    def test_outputs_match_written_listings(self):
+        metadata_index = MetadataIndex(self.index_path, page_size=2)
+        build_site(self.content, self.output, metadata_index=metadata_index)
+        for page in PAGES:
+            metadata_index.update(page, os.path.join(self.content, page), {"source": None, "output": page[:-3] + ".html"})
+        self.assertEqual(metadata_index.outputs(), set(metadata_index.generated))
+
+    def test_front_matter_is_skipped_when_streaming(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        streamed = os.path.join(self.tmp.name, "streamed")
+        build_site(self.content, self.output, template=template)
+        build_site(self.content, streamed, template=template, stream_threshold=0)
+        for page in ("first", "second", "third"):
+            self.assertEqual(read(os.path.join(streamed, "blog", page + ".html")), read(os.path.join(self.output, "blog", page + ".html")))
+
+    def test_paginated_listings(self):
+        self.build()
+        self.assertEqual(
+            read(os.path.join(self.output, "posts", "index.html")),
+            '<div><ul><li><a href="/blog/third.html">third</a><time>2024-03-01</time></li>'
+            '<li><a href="/blog/second.html">Second</a><time>2024-02-01</time></li></ul>'
+            '<nav><a href="/posts/page/2/" rel="next">Older</a></nav></div>',
+        )
+        self.assertEqual(
+            read(os.path.join(self.output, "posts", "page", "2", "index.html")),
+            '<div><ul><li><a href="/blog/first.html">First &amp; best</a><time>2024-01-01</time></li></ul>'
+            '<nav><a href="/posts/" rel="prev">Newer</a></nav></div>',
+        )
+        self.assertIn("Second", read(os.path.join(self.output, "tags", "static-sites", "index.html")))
+        self.assertIn("First", read(os.path.join(self.output, "tags", "python", "index.html")))
+
+    def test_sitemap_and_feed(self):
+        self.build()
+        sitemap = read(os.path.join(self.output, "sitemap.xml"))
+        self.assertIn("<url><loc>https://example.com/</loc></url>", sitemap)
+        self.assertIn("<url><loc>https://example.com/blog/second.html</loc><lastmod>2024-02-01</lastmod></url>", sitemap)
+        self.assertNotIn("draft", sitemap)
+        feed = read(os.path.join(self.output, "feed.xml"))
+        self.assertLess(feed.index("third"), feed.index("Second"))
+        self.assertIn("<pubDate>Thu, 01 Feb 2024 00:00:00 +0000</pubDate><description>The second post</description>", feed)
+        self.assertNotIn("Draft", feed)
+
+    def test_incremental_listings(self):
+        manifest = os.path.join(self.tmp.name, "cache", "manifest.json")
+        changes = os.path.join(self.tmp.name, "cache", "changes.json")
+        self.build(manifest_path=manifest)
+        self.assertEqual(self.build(manifest_path=manifest), [])
+        os.remove(os.path.join(self.content, "blog", "first.md"))
+        self.build(manifest_path=manifest, changes_path=changes)
+        self.assertFalse(os.path.exists(os.path.join(self.output, "posts", "page")))
+        self.assertEqual(load_manifest(changes), {
+            "added": [],
+            "modified": ["feed.xml", "posts/index.html", "sitemap.xml", "tags/python/index.html"],
+            "deleted": [os.path.join("blog", "first.html"), "posts/page/2/index.html"],
+        })
+        self.assertNotIn("blog/first.md", load_manifest(self.index_path)["pages"])
+
+
+if __name__ == "__main__":
+    unittest.main()
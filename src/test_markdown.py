@@ -1,6 +1,13 @@
+import io
+import os
+import random
+import tempfile
+import tracemalloc
 import unittest
 
-from markdown_helpers import markdown_to_blocks, BlockType, block_to_block_type, text_to_children, markdown_to_html_node
+from multiprocessing import Pool
+
+from markdown_helpers import markdown_to_blocks, BlockType, block_to_block_type, text_to_children, markdown_to_html_node, iter_blocks, StreamedDocument, markdown_to_html_node_parallel
 
 class TestMarkdowns(unittest.TestCase):
 
@@ -176,6 +183,72 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_iter_blocks_from_file(self):
+        md = "# Title\n\n  \n> quote\n> more\n\n\n1. one\n2. two\n"
+        blocks = list(iter_blocks(io.StringIO(md)))
+        self.assertEqual(
+            blocks,
+            [
+                (BlockType.HEADING, ["# Title"]),
+                (BlockType.QUOTE, ["> quote", "> more"]),
+                (BlockType.ORDERED_LIST, ["1. one", "2. two"]),
+            ],
+        )
+
+    def test_iter_blocks_matches_markdown_to_blocks(self):
+        rng = random.Random(4321)
+        pieces = ["a", " ", "\n", "\n\n", "# ", "> ", "- ", "1. ", "2. ", "```", "\t"]
+        for _ in range(5000):
+            md = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 20)))
+            expected = [(block_to_block_type(block), block.split("\n")) for block in markdown_to_blocks(md)]
+            self.assertEqual(list(iter_blocks(md.split("\n"))), expected, msg=repr(md))
+            self.assertEqual(list(iter_blocks(io.StringIO(md))), expected, msg=repr(md))
+
+    def test_streamed_document_matches_markdown_to_html_node(self):
+        md = "# Title\n\nSome **bold** text\n\n- a\n- [b](/b)\n\n```\ncode\n```\n\n> quote"
+        buffer = io.StringIO()
+        StreamedDocument(io.StringIO(md)).write_html(buffer)
+        self.assertEqual(buffer.getvalue(), markdown_to_html_node(md).to_html())
+
+    def test_parallel_matches_serial(self):
+        md = "\n\n".join(
+            f"# Section {i}\n\nText with **bold** and [link](/{i})\n\n- item {i}\n- other\n\n```\ncode {i}\n```"
+            for i in range(100)
+        )
+        expected = markdown_to_html_node(md).to_html()
+        with Pool(2) as pool:
+            node = markdown_to_html_node_parallel(md, pool, chunk_size=7, min_blocks=10)
+            self.assertEqual(node.to_html(), expected)
+            self.assertEqual(len(node.children), 58)
+            small = markdown_to_html_node_parallel("# Small\n\ntext", pool, min_blocks=10)
+        self.assertEqual(small.to_html(), markdown_to_html_node("# Small\n\ntext").to_html())
+        self.assertEqual(small.children[0].tag, "h1")
+
+    def test_fused_matches_tree(self):
+        md = "# The **Title**\n\nText *with* `code` and ![img](/i.png)\n\n> quote [link](/l)\n\n1. one\n2. **two**"
+        node = markdown_to_html_node(md, fused=True)
+        self.assertEqual(node.to_html(), markdown_to_html_node(md).to_html())
+        self.assertEqual(node.children[0].children[1].tag, "b")
+        self.assertEqual(len(node.children[1].children), 1)
+
+    def test_empty_document(self):
+        self.assertEqual(markdown_to_html_node("").to_html(), "<div></div>")
+        self.assertEqual("".join(StreamedDocument([]).iter_html()), "<div></div>")
+
+    def test_streamed_document_bounded_memory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source_path = os.path.join(tmp, "big.md")
+            with open(source_path, "w", encoding="utf-8") as f:
+                for i in range(2000):
+                    f.write(f"Paragraph {i} with **bold** and a [link](/page/{i}) in it. " + "filler text " * 50 + "\n\n")
+            source_size = os.path.getsize(source_path)
+            tracemalloc.start()
+            with open(source_path, encoding="utf-8") as source, open(os.path.join(tmp, "big.html"), "w", encoding="utf-8") as out:
+                StreamedDocument(source).write_html(out)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.assertLess(peak, source_size // 4)
+
 
 if __name__ == "__main__":
     unittest.main()
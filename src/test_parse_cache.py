@@ -0,0 +1,82 @@
+import os
+import tempfile
+import types
+import unittest
+
+import front_matter
+from markdown_helpers import BlockType, markdown_to_html_node
+from parse_cache import PARSER_VERSION, ParseCache, modules_version, parser_version, blocks_to_html_node, decode_blocks, encode_blocks, parse_markdown
+from textnode import TextNode, TextType
+
+MARKDOWN = """# A **bold** title
+
+Paragraph with a [link](/a) and ![image](/b.png)
+
+> quoted *text*
+
+- one `code`
+- two
+
+1. first
+2. second
+
+```
+code **stays**
+```
+"""
+
+class TestParseCache(unittest.TestCase):
+    def test_parser_version_covers_front_matter(self):
+        self.assertEqual(parser_version(), PARSER_VERSION)
+        source = front_matter.__file__
+        with tempfile.TemporaryDirectory() as tmp:
+            front_matter.__file__ = os.path.join(tmp, "front_matter.py")
+            try:
+                with open(front_matter.__file__, "w", encoding="utf-8") as f:
+                    f.write("FENCE = '+++'\n")
+                self.assertNotEqual(parser_version(), PARSER_VERSION)
+            finally:
+                front_matter.__file__ = source
+
+    def test_modules_version_follows_sources(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            module = types.SimpleNamespace(__file__=os.path.join(tmp, "renderer.py"))
+            with open(module.__file__, "w", encoding="utf-8") as f:
+                f.write("A = 1\n")
+            before = modules_version([module], PARSER_VERSION)
+            self.assertEqual(modules_version([module], PARSER_VERSION), before)
+            with open(module.__file__, "w", encoding="utf-8") as f:
+                f.write("A = 2\n")
+            self.assertNotEqual(modules_version([module], PARSER_VERSION), before)
+
+    def test_parse_markdown_matches_markdown_to_html_node(self):
+        node, blocks = parse_markdown(MARKDOWN)
+        self.assertEqual(node.to_html(), markdown_to_html_node(MARKDOWN).to_html())
+        self.assertEqual(blocks[0][0], BlockType.HEADING)
+        self.assertEqual(blocks[0][2], [[TextNode("A ", TextType.TEXT), TextNode("bold", TextType.BOLD), TextNode(" title", TextType.TEXT)]])
+
+    def test_blocks_round_trip(self):
+        node, blocks = parse_markdown(MARKDOWN)
+        decoded = decode_blocks(encode_blocks(blocks))
+        self.assertEqual(decoded, blocks)
+        self.assertEqual(blocks_to_html_node(decoded).to_html(), node.to_html())
+
+    def test_cache_store_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ParseCache(tmp)
+            self.assertIsNone(cache.load("ab" * 32))
+            _, blocks = parse_markdown(MARKDOWN)
+            cache.store("ab" * 32, blocks)
+            self.assertEqual(ParseCache(tmp).load("ab" * 32), blocks)
+            self.assertTrue(os.path.isdir(os.path.join(tmp, PARSER_VERSION)))
+
+    def test_other_parser_versions_are_discarded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            stale = os.path.join(tmp, "0" * 16)
+            os.makedirs(stale)
+            ParseCache(tmp)
+            self.assertFalse(os.path.exists(stale))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import json
+import os
+import tempfile
+import unittest
+
+from build import build_site, load_manifest
+from template import Template
+from search_index import PageTerms, SearchIndex, delta_encode, load_page_terms, store_page_terms
+from textnode import text_to_textnodes
+
+PAGES = {
+    "index.md": "# Home\n\nWelcome to the **site**, welcome.",
+    "blog/first.md": "# First post\n\n- one\n- two [site](/)",
+    "blog/second.md": "```\nnot indexed\n```\n\nSecond `post`",
+}
+
+def read_index(output):
+    with open(os.path.join(output, "search", "index.json"), encoding="utf-8") as f:
+        index = json.load(f)
+    shards = {}
+    for prefix in index["shards"]:
+        with open(os.path.join(output, "search", "terms", prefix + ".json"), encoding="utf-8") as f:
+            shards.update(json.load(f))
+    return index, shards
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.output = os.path.join(self.tmp.name, "public")
+        self.cache = os.path.join(self.tmp.name, "search")
+        for page, markdown in PAGES.items():
+            self.write_page(page, markdown)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_page(self, page, markdown):
+        path = os.path.join(self.content, page)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(markdown)
+
+    def test_page_terms(self):
+        terms = PageTerms()
+        terms.add(text_to_textnodes("Hello **hello** [World](/w)"))
+        terms.add(text_to_textnodes("world"))
+        self.assertEqual(terms.postings, {"hello": [0, 1], "world": [2, 3]})
+
+    def test_delta_encode(self):
+        self.assertEqual(delta_encode([2, 5, 9]), [2, 3, 4])
+
+    def test_page_terms_round_trip(self):
+        store_page_terms(self.cache, "ab" * 32, {"hello": [0, 4]})
+        self.assertEqual(load_page_terms(self.cache, "ab" * 32), {"hello": [0, 4]})
+
+    def test_build_writes_sharded_index(self):
+        build_site(self.content, self.output, jobs=2, search_index=SearchIndex(self.cache))
+        index, shards = read_index(self.output)
+        self.assertEqual(index["pages"], ["/index.html", "/blog/first.html", "/blog/second.html"])
+        self.assertEqual(index["prefix_length"], 2)
+        self.assertEqual(shards["welcome"], [[0, [1, 4]]])
+        self.assertEqual(shards["site"], [[0, [4]], [1, [4]]])
+        self.assertEqual(shards["post"], [[1, [1]], [2, [1]]])
+        self.assertNotIn("indexed", shards)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.output, "search", "terms"))), sorted(prefix + ".json" for prefix in index["shards"]))
+
+    def test_streamed_page_with_template(self):
+        self.write_page("index.md", "# Hello\n\nhello world body")
+        build_site(self.content, self.output, template=Template("<title>{{ Title }}</title>{{ Content }}"), stream_threshold=0, search_index=SearchIndex(self.cache))
+        _, shards = read_index(self.output)
+        self.assertEqual(shards["hello"], [[0, [0, 1]]])
+        self.assertEqual(shards["body"], [[0, [3]]])
+
+    def test_index_files_are_recorded_as_changes(self):
+        manifest = os.path.join(self.tmp.name, "manifest.json")
+        changes = os.path.join(self.tmp.name, "changes.json")
+        self.write_page("index.md", "alpha")
+        build_site(self.content, self.output, manifest_path=manifest, search_index=SearchIndex(self.cache))
+        self.write_page("index.md", "beta")
+        written = build_site(self.content, self.output, manifest_path=manifest, changes_path=changes, search_index=SearchIndex(self.cache))
+        terms = os.path.join("search", "terms")
+        self.assertEqual(load_manifest(changes), {
+            "added": [os.path.join(terms, "be.json")],
+            "modified": ["index.html", os.path.join("search", "index.json")],
+            "deleted": [os.path.join(terms, "al.json")],
+        })
+        self.assertIn(os.path.join(self.output, terms, "be.json"), written)
+        self.assertEqual(build_site(self.content, self.output, manifest_path=manifest, search_index=SearchIndex(self.cache)), [])
+
+    def test_spilled_index_matches_in_memory_index(self):
+        build_site(self.content, self.output, search_index=SearchIndex(self.cache))
+        spilled = os.path.join(self.tmp.name, "spilled")
+        build_site(self.content, spilled, search_index=SearchIndex(self.cache, max_buffered=1))
+        self.assertEqual(read_index(self.output), read_index(spilled))
+        self.assertFalse(os.path.exists(os.path.join(self.cache, "runs")))
+
+    def test_incremental_build_keeps_unchanged_pages_indexed(self):
+        manifest = os.path.join(self.tmp.name, "manifest.json")
+        build_site(self.content, self.output, manifest_path=manifest, search_index=SearchIndex(self.cache))
+        self.write_page("blog/second.md", "Rewritten")
+        os.remove(os.path.join(self.content, "blog", "first.md"))
+        written = build_site(self.content, self.output, manifest_path=manifest, search_index=SearchIndex(self.cache))
+        self.assertEqual(written[0], os.path.join(self.output, "blog", "second.html"))
+        self.assertIn(os.path.join(self.output, "search", "index.json"), written)
+        index, shards = read_index(self.output)
+        self.assertEqual(index["pages"], ["/index.html", "/blog/second.html"])
+        self.assertEqual(shards["rewritten"], [[1, [0]]])
+        self.assertEqual(shards["welcome"], [[0, [1, 4]]])
+        self.assertNotIn("post", shards)
+        self.assertEqual(sum(len(files) for _, _, files in os.walk(os.path.join(self.cache, "pages"))), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
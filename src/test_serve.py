@@ -0,0 +1,109 @@
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+
+from assets import AssetSync
+from serve import content_snapshot, etag_matches, make_server, watch
+
+class TestServe(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.output = os.path.join(self.tmp.name, "public")
+        os.makedirs(self.content)
+        os.makedirs(self.output)
+        with open(os.path.join(self.output, "index.html"), "w", encoding="utf-8") as f:
+            f.write("<p>hi</p>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_etag_not_modified(self):
+        server = make_server(self.output, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/"
+            with urllib.request.urlopen(url) as response:
+                etag = response.headers["ETag"]
+                self.assertEqual(response.read(), b"<p>hi</p>")
+            self.assertIsNotNone(etag)
+            request = urllib.request.Request(url, headers={"If-None-Match": etag})
+            with self.assertRaises(urllib.error.HTTPError) as context:
+                urllib.request.urlopen(request)
+            self.assertEqual(context.exception.code, 304)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_etag_matches(self):
+        etag = '"1a-2b"'
+        self.assertTrue(etag_matches('"1a-2b"', etag))
+        self.assertTrue(etag_matches('"x", W/"1a-2b"', etag))
+        self.assertTrue(etag_matches("*", etag))
+        self.assertFalse(etag_matches('"1a-2b0"', etag))
+        self.assertFalse(etag_matches('"01a-2b", "1a"', etag))
+        self.assertFalse(etag_matches("", etag))
+
+    def test_content_snapshot_only_markdown(self):
+        for name in ["a.md", "b.txt"]:
+            with open(os.path.join(self.content, name), "w", encoding="utf-8") as f:
+                f.write("text")
+        self.assertEqual(list(content_snapshot(self.content)), [os.path.join(self.content, "a.md")])
+
+    def test_content_snapshot_includes_static(self):
+        static = os.path.join(self.tmp.name, "static")
+        os.makedirs(static)
+        with open(os.path.join(static, "site.css"), "w", encoding="utf-8") as f:
+            f.write("body {}")
+        self.assertEqual(list(content_snapshot(self.content, None, static)), [os.path.join(static, "site.css")])
+
+    def test_watch_syncs_changed_asset(self):
+        static = os.path.join(self.tmp.name, "static")
+        os.makedirs(static)
+        build_options = {"assets": AssetSync(static, os.path.join(self.tmp.name, "static-manifest.json"))}
+        stop_event = threading.Event()
+        rebuilds = []
+        on_rebuild = lambda written, seconds: rebuilds.append(written)
+        thread = threading.Thread(target=watch, args=(self.content, self.output, build_options, 0.01, stop_event, content_snapshot(self.content, None, static), None, on_rebuild))
+        thread.start()
+        try:
+            with open(os.path.join(static, "site.css"), "w", encoding="utf-8") as f:
+                f.write("body {}")
+            for _ in range(500):
+                if rebuilds:
+                    break
+                stop_event.wait(0.01)
+        finally:
+            stop_event.set()
+            thread.join()
+        self.assertEqual(rebuilds[0], [os.path.join(self.output, "site.css")])
+
+    def test_watch_rebuilds_changed_page(self):
+        stop_event = threading.Event()
+        manifest = os.path.join(self.tmp.name, "manifest.json")
+        rebuilds = []
+        on_rebuild = lambda written, seconds: rebuilds.append(written)
+        thread = threading.Thread(target=watch, args=(self.content, self.output, {"manifest_path": manifest}, 0.01, stop_event, content_snapshot(self.content), None, on_rebuild))
+        thread.start()
+        try:
+            with open(os.path.join(self.content, "new.md"), "w", encoding="utf-8") as f:
+                f.write("# New")
+            path = os.path.join(self.output, "new.html")
+            for _ in range(500):
+                if rebuilds:
+                    break
+                stop_event.wait(0.01)
+        finally:
+            stop_event.set()
+            thread.join()
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<div><h1>New</h1></div>")
+        self.assertEqual(rebuilds[0], [path])
+
+
+if __name__ == "__main__":
+    unittest.main()
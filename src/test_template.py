@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from htmlnode import HTMLNode, LeafNode
+from markdown_helpers import markdown_to_html_node
+from template import Template, extract_title, load_template, page_slots
+
+class TestTemplate(unittest.TestCase):
+    def test_parse_segments(self):
+        template = Template("<title>{{ Title }}</title><main>{{Content}}</main>{{ Author }}")
+        self.assertEqual(template.statics, ["<title>", "</title><main>", "</main>", ""])
+        self.assertEqual(template.slots, ["Title", "Content", "Author"])
+
+    def test_render_with_node_and_metadata(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}<p>{{ Author }}</p>{{ Missing }}")
+        node = HTMLNode("div", children=[LeafNode("p", "body")])
+        html = template.render({"Title": "Home", "Content": node, "Author": "Boots"})
+        self.assertEqual(html, "<title>Home</title><div><p>body</p></div><p>Boots</p>")
+
+    def test_no_placeholders(self):
+        self.assertEqual(Template("<p>static</p>").render({}), "<p>static</p>")
+
+    def test_page_slots(self):
+        content = LeafNode("p", "body")
+        values = page_slots({"author": "Ann & Bo", "tags": ["a", "<b>"], "title": "raw", "content": "spoof"}, "T & U", content)
+        self.assertEqual(values["Author"], "Ann &amp; Bo")
+        self.assertEqual(values["Tags"], "a, &lt;b&gt;")
+        self.assertEqual(values["Title"], "T &amp; U")
+        self.assertIs(values["Content"], content)
+
+    def test_extract_title(self):
+        node = markdown_to_html_node("Intro paragraph\n\n## Sub\n\n# The **Real** Title\n\n# Second")
+        self.assertEqual(extract_title(node), "The Real Title")
+
+    def test_extract_title_missing(self):
+        self.assertIsNone(extract_title(markdown_to_html_node("just text")))
+
+    def test_load_template_cached_until_modified(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("{{ Content }}")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("<main>{{ Content }}</main>")
+            os.utime(path, ns=(1, 1))
+            self.assertEqual(load_template(path).statics, ["<main>", "</main>"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
+import random
 import unittest
 
-from textnode import TextNode, TextType, split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes
+from textnode import TextNode, TextType, split_nodes_delimiter, extract_markdown_images, extract_markdown_links, split_nodes_image, split_nodes_link, text_to_textnodes, text_to_textnodes_multipass
 
 
 class TestTextNode(unittest.TestCase):
@@ -24,6 +25,11 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("A", TextType.ITALIC)
         self.assertNotEqual(node, node2, msg="Nodes with different texttype should not be equal")
 
+    def test_textnode_is_slotted(self):
+        node = TextNode("A", TextType.BOLD)
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual(repr(node), "TextNode(A, bold, None)")
+
     def test_delimiters_work(self):
         node = TextNode("some `code` here", TextType.TEXT)
         result = split_nodes_delimiter([node], "`", TextType.CODE)
@@ -288,6 +294,23 @@ class TestTextNode(unittest.TestCase):
         actual_output = text_to_textnodes(input_text)
         self.assertListEqual(expected_output, actual_output)
 
+    def test_text_to_textnodes_matches_multipass(self):
+        rng = random.Random(1234)
+        pieces = ["a", "b", " ", "!", "[", "]", "(", ")", "*", "**", "`", "![x](y)", "[l](u)", "\n"]
+        for _ in range(20000):
+            text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 16)))
+            try:
+                expected = text_to_textnodes_multipass(text)
+            except Exception as error:
+                with self.assertRaises(type(error), msg=repr(text)):
+                    text_to_textnodes(text)
+                continue
+            self.assertListEqual(expected, text_to_textnodes(text), msg=repr(text))
+
+    def test_text_to_textnodes_whitespace_between_links(self):
+        input_text = "[a](b) ![c](d) **e**"
+        self.assertListEqual(text_to_textnodes_multipass(input_text), text_to_textnodes(input_text))
+
 
 if __name__ == "__main__":
     unittest.main()
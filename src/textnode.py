@@ -10,6 +10,8 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url=None):
         self.text = text
         self.text_type = text_type
@@ -48,14 +50,16 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
     return new_nodes
 
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+DELIMITERS = (("**", TextType.BOLD), ("*", TextType.ITALIC), ("`", TextType.CODE))
+
 def extract_markdown_images(text):
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
+    matches = IMAGE_PATTERN.findall(text)
     return matches
 
 def extract_markdown_links(text):
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
+    matches = LINK_PATTERN.findall(text)
     return matches
 
 def split_nodes_image(old_nodes):
@@ -106,7 +110,7 @@ def split_nodes_link(old_nodes):
     return new_nodes
 
 
-def text_to_textnodes(text):
+def text_to_textnodes_multipass(text):
     nodes = [TextNode(text, TextType.TEXT)]
     nodes = split_nodes_image(nodes)
     nodes = split_nodes_link(nodes)
@@ -115,11 +119,59 @@ def text_to_textnodes(text):
     nodes = split_nodes_delimiter(nodes, "`",  TextType.CODE)
     return nodes
 
+# Single left-to-right scan producing the same stream as the multipass
+# pipeline above: images first, then links in the gaps between images, then
+# the delimiters in DELIMITERS order. Matches are located by position, so no
+# intermediate node lists are built and the text is never re-split per match.
+def text_to_textnodes(text):
+    nodes = []
+    scan_images(text, 0, len(text), nodes)
+    return nodes
 
-
-
-
-
-
-
-
+def scan_images(text, start, end, nodes):
+    if text.find("![", start, end) == -1:
+        scan_links(text, start, end, nodes)
+    else:
+        scan_matches(text, start, end, IMAGE_PATTERN, TextType.IMAGE, scan_links, nodes)
+
+def scan_links(text, start, end, nodes):
+    if text.find("](", start, end) == -1:
+        split_delimiters(text[start:end], 0, nodes)
+    else:
+        scan_matches(text, start, end, LINK_PATTERN, TextType.LINK, scan_delimiters, nodes)
+
+def scan_delimiters(text, start, end, nodes):
+    split_delimiters(text[start:end], 0, nodes)
+
+def scan_matches(text, start, end, pattern, text_type, next_stage, nodes):
+    position = start
+    for match in pattern.finditer(text, start, end):
+        match_start, match_end = match.span()
+        if text[position:match_start].strip():
+            next_stage(text, position, match_start, nodes)
+        nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+        position = match_end
+    if position == start:
+        next_stage(text, start, end, nodes)
+    elif text[position:end].strip():
+        next_stage(text, position, end, nodes)
+
+def split_delimiters(text, level, nodes):
+    if level == 0 and "*" not in text and "`" not in text:
+        nodes.append(TextNode(text, TextType.TEXT))
+        return
+    if level == len(DELIMITERS):
+        nodes.append(TextNode(text, TextType.TEXT))
+        return
+    delimiter, text_type = DELIMITERS[level]
+    parts = text.split(delimiter)
+    if len(parts) == 1:
+        split_delimiters(text, level + 1, nodes)
+        return
+    if len(parts) % 2 == 0:
+        raise Exception("Unclosed delimiter detected")
+    for i, part in enumerate(parts):
+        if i % 2:
+            nodes.append(TextNode(part, text_type))
+        elif part != "":
+            split_delimiters(part, level + 1, nodes)